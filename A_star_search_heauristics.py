@@ -3,6 +3,14 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+import io
+import time
+import hashlib
+import threading
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
 from matplotlib.colors import LinearSegmentedColormap
 
 # ---------------------------
@@ -13,6 +21,10 @@ if 'current_maze_index' not in st.session_state:
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 1
 
+# Rendered step frames kept in memory, and how many steps either side to prefetch
+FRAME_CACHE_SIZE = 256
+PREFETCH_RADIUS = 2
+
 # ---------------------------
 # 1. Maze Definitions
 # ---------------------------
@@ -77,64 +89,80 @@ MAZE_CONFIGS = [
 ]
 
 # ---------------------------
-# 2. convert_grid_to_graph
+# 2. Compact node store & convert_grid_to_graph
 # ---------------------------
+class MazeNodeStore:
+    """Flat-index view of a maze grid: node id = r * C + c.
+
+    Coordinates and heuristics live in NumPy arrays indexed by node id, so
+    grid position <-> node id conversions are plain arithmetic instead of
+    per-node dicts and reverse-lookup scans.
+    """
+    __slots__ = ("R", "C", "open", "h")
+
+    def __init__(self, grid, goal_pos_grid):
+        self.R, self.C = len(grid), len(grid[0])
+        self.open = np.asarray(grid, dtype=np.int8).ravel() == 0
+        rows, cols = np.divmod(np.arange(self.R * self.C, dtype=np.int32), self.C)
+        goal_r, goal_c = goal_pos_grid
+        # Manhattan distance to the goal; walls keep -1 so they never look "close"
+        self.h = (np.abs(goal_r - rows) + np.abs(goal_c - cols)).astype(np.int32)
+        self.h[~self.open] = -1
+
+    def node_id(self, r, c):
+        return r * self.C + c
+
+    def grid_pos(self, node_id):
+        return divmod(int(node_id), self.C)
+
+    def plot_pos(self, node_id):
+        r, c = divmod(int(node_id), self.C)
+        return (c, -r)
+
+    def is_path(self, r, c):
+        return 0 <= r < self.R and 0 <= c < self.C and bool(self.open[r * self.C + c])
+
+    def nodes(self):
+        return np.flatnonzero(self.open)
+
+    def neighbors(self, node_id):
+        r, c = divmod(int(node_id), self.C)
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if self.is_path(nr, nc):
+                yield nr * self.C + nc
+
+    def layout(self, node_ids):
+        """Plotting positions {node_id: (c, -r)} for networkx drawing."""
+        return {n: self.plot_pos(n) for n in node_ids}
+
+    def max_h(self):
+        return int(self.h.max()) if self.open.any() else 0
+
+
 def convert_grid_to_graph(grid, start_pos_grid, goal_pos_grid):
-    R, C = len(grid), len(grid[0])
+    store = MazeNodeStore(grid, goal_pos_grid)
+    R, C = store.R, store.C
     G = nx.Graph()
-    
-    dr = [-1, 1, 0, 0]
-    dc = [0, 0, -1, 1]
 
-    pos = {} 
-    node_id_to_grid_pos = {} 
-    grid_pos_to_node_id = {} 
-    node_counter = 0
+    ids = np.arange(R * C).reshape(R, C)
+    open_2d = store.open.reshape(R, C)
+    G.add_nodes_from(ids[open_2d].tolist())
 
-    for r in range(R):
-        for c in range(C):
-            if grid[r][c] == 0: # If it's a path
-                node_id = node_counter
-                grid_pos = (r, c)
-                
-                G.add_node(node_id, grid_pos=grid_pos) 
-                pos[node_id] = (c, -r) 
-                node_id_to_grid_pos[node_id] = grid_pos
-                grid_pos_to_node_id[grid_pos] = node_id
-                node_counter += 1
-
-    # Second pass to ensure all edges are added
-    for r in range(R):
-        for c in range(C):
-            if grid[r][c] == 0:
-                node_id = grid_pos_to_node_id[(r, c)]
-                for i in range(4):
-                    nr, nc = r + dr[i], c + dc[i]
-                    if 0 <= nr < R and 0 <= nc < C and grid[nr][nc] == 0:
-                        neighbor_id = grid_pos_to_node_id.get((nr, nc))
-                        if neighbor_id is not None:
-                            G.add_edge(node_id, neighbor_id, weight=1) 
+    # Horizontal and vertical neighbours that are both paths become edges
+    horiz = open_2d[:, :-1] & open_2d[:, 1:]
+    vert = open_2d[:-1, :] & open_2d[1:, :]
+    G.add_edges_from(zip(ids[:, :-1][horiz].tolist(), ids[:, 1:][horiz].tolist()), weight=1)
+    G.add_edges_from(zip(ids[:-1, :][vert].tolist(), ids[1:, :][vert].tolist()), weight=1)
 
     # Convert start/goal grid positions to their corresponding node IDs
-    try:
-        START_NODE = grid_pos_to_node_id[start_pos_grid]
-        GOAL_NODE = grid_pos_to_node_id[goal_pos_grid]
-    except KeyError:
+    if not (store.is_path(*start_pos_grid) and store.is_path(*goal_pos_grid)):
         st.error(f"Start {start_pos_grid} or Goal {goal_pos_grid} position is inside a wall (1) or out of bounds. Please check the maze configuration.")
-        return nx.Graph(), None, None, {}, {}, {}, {}
-
-    # Calculate heuristic (Manhattan distance from each node's grid position to the goal)
-    goal_r, goal_c = goal_pos_grid
-    heuristic_data = {}
-    for node_id in G.nodes:
-        r, c = G.nodes[node_id]['grid_pos']
-        h_value = abs(goal_r - r) + abs(goal_c - c)
-        G.nodes[node_id]['h'] = h_value 
-        heuristic_data[node_id] = h_value 
+        return nx.Graph(), None, None, store
 
-    node_labels = {k: f"H:{v}" for k, v in heuristic_data.items()}
+    START_NODE = store.node_id(*start_pos_grid)
+    GOAL_NODE = store.node_id(*goal_pos_grid)
 
-    return G, START_NODE, GOAL_NODE, node_labels, pos, heuristic_data, node_id_to_grid_pos
+    return G, START_NODE, GOAL_NODE, store
 
 # ---------------------------
 # 3. A* Search
@@ -146,7 +174,7 @@ def reconstruct_path(came_from, current):
         path.append(current)
     return path[::-1]
 
-def a_star_search(G, start, goal):
+def a_star_search(G, start, goal, store):
     if start is None or goal is None:
         return None, [], pd.DataFrame()
         
@@ -154,7 +182,7 @@ def a_star_search(G, start, goal):
     g_score[start] = 0
     
     f_score = {node: float('inf') for node in G.nodes}
-    f_score[start] = g_score[start] + G.nodes[start]['h']
+    f_score[start] = g_score[start] + store.h[start]
     
     came_from = {}
     open_set = [(f_score[start], start)] 
@@ -188,9 +216,9 @@ def a_star_search(G, start, goal):
         equation_history_df.loc[len(equation_history_df)] = [
             step_count,
             current_node,
-            f"{g_score[current_node]:.1f} + {G.nodes[current_node]['h']:.1f} = {f_score[current_node]:.1f}",
+            f"{g_score[current_node]:.1f} + {store.h[current_node]:.1f} = {f_score[current_node]:.1f}",
             f"{g_score[current_node]:.1f}",
-            f"{G.nodes[current_node]['h']:.1f}"
+            f"{store.h[current_node]:.1f}"
         ]
 
         if current_node == goal:
@@ -209,9 +237,9 @@ def a_star_search(G, start, goal):
             equation_history_df.loc[len(equation_history_df)] = [
                 step_count,
                 goal,
-                f"{g_score[goal]:.1f} + {G.nodes[goal]['h']:.1f} = {f_score[goal]:.1f}",
+                f"{g_score[goal]:.1f} + {store.h[goal]:.1f} = {f_score[goal]:.1f}",
                 f"{g_score[goal]:.1f}",
-                f"{G.nodes[goal]['h']:.1f}"
+                f"{store.h[goal]:.1f}"
             ]
             return final_path, history, equation_history_df
 
@@ -222,7 +250,7 @@ def a_star_search(G, start, goal):
             if tentative_g_score < g_score[neighbor]:
                 came_from[neighbor] = current_node
                 g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + G.nodes[neighbor]['h']
+                f_score[neighbor] = tentative_g_score + store.h[neighbor]
 
                 found_in_open = False
                 for i, (f, node) in enumerate(open_set):
@@ -235,11 +263,111 @@ def a_star_search(G, start, goal):
 
     return None, history, equation_history_df
 
+def ida_star_search(store, start, goal, tt_size=0):
+    """Iterative-deepening A*: memory is linear in the path depth.
+
+    Walks the maze directly through the node store (unit edge weights), so no
+    open set, g/f tables or per-step history are kept. With tt_size > 0 a
+    transposition table of at most tt_size entries remembers the best G seen for
+    a node within the current iteration and prunes worse revisits.
+    """
+    stats = {'iterations': 0, 'expansions': 0, 'max_depth': 0, 'tt_peak': 0}
+    if start is None or goal is None:
+        return None, stats
+    if start == goal:
+        return [start], stats
+
+    h = store.h
+    bound = int(h[start])
+    while True:
+        stats['iterations'] += 1
+        table = OrderedDict() if tt_size > 0 else None
+        next_bound = float('inf')
+        path = [start]
+        on_path = {start}
+        frontier = [store.neighbors(start)]
+        stats['expansions'] += 1
+
+        while frontier:
+            neighbor = next(frontier[-1], None)
+            if neighbor is None:
+                frontier.pop()
+                on_path.discard(path.pop())
+                continue
+            if neighbor in on_path:
+                continue
+
+            g = len(path)
+            f = g + int(h[neighbor])
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            if neighbor == goal:
+                return path + [neighbor], stats
+
+            if table is not None:
+                seen_g = table.get(neighbor)
+                if seen_g is not None and seen_g <= g:
+                    continue
+                table[neighbor] = g
+                table.move_to_end(neighbor)
+                if len(table) > tt_size:
+                    table.popitem(last=False)
+                stats['tt_peak'] = max(stats['tt_peak'], len(table))
+
+            path.append(neighbor)
+            on_path.add(neighbor)
+            frontier.append(store.neighbors(neighbor))
+            stats['expansions'] += 1
+            stats['max_depth'] = max(stats['max_depth'], len(path) - 1)
+
+        if next_bound == float('inf'):
+            return None, stats
+        bound = next_bound
+
+
+def _measure(fn, *args):
+    """Runs fn(*args) and returns (result, seconds, peak traced bytes)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def compare_solvers(maze_configs, tt_size=0):
+    """Time/memory comparison of A* and IDA* on each maze configuration."""
+    rows = []
+    for config in maze_configs:
+        G, start, goal, store = convert_grid_to_graph(config["grid"], config["start"], config["goal"])
+        (a_path, a_history, _), a_time, a_peak = _measure(a_star_search, G, start, goal, store)
+        (i_path, i_stats), i_time, i_peak = _measure(ida_star_search, store, start, goal, tt_size)
+        rows.append({
+            'Maze': config["name"],
+            'A* Path Length': len(a_path) if a_path else None,
+            'A* Steps': len(a_history),
+            'A* Time (ms)': round(a_time * 1000, 2),
+            'A* Peak Memory (KB)': round(a_peak / 1024, 1),
+            'IDA* Path Length': len(i_path) if i_path else None,
+            'IDA* Iterations': i_stats['iterations'],
+            'IDA* Expansions': i_stats['expansions'],
+            'IDA* Time (ms)': round(i_time * 1000, 2),
+            'IDA* Peak Memory (KB)': round(i_peak / 1024, 1),
+        })
+    return pd.DataFrame(rows)
+
 # ---------------------------
 # 4. Visualization Utilities
 # ---------------------------
-def draw_graph_a_star(G, pos, start, goal, node_labels, current=None, open_set=[], closed_set=[], final_path=[], g_scores={}, f_scores={}, step_title=""):
-    fig, ax = plt.subplots(figsize=(12, 10)) 
+def draw_graph_a_star(G, store, start, goal, current=None, open_set=[], closed_set=[], final_path=[], g_scores={}, f_scores={}, step_title=""):
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
+    pos = store.layout(G.nodes)
+    node_labels = {node: f"H:{store.h[node]}" for node in G.nodes}
     node_color = ['#A3E4D7' for node in G.nodes] 
     
     for i, node in enumerate(G.nodes):
@@ -280,26 +408,27 @@ def draw_graph_a_star(G, pos, start, goal, node_labels, current=None, open_set=[
     for node in G.nodes:
         if node in f_scores and f_scores[node] != float('inf'):
             g = f"{g_scores.get(node, 0):.1f}"
-            h = f"{G.nodes[node]['h']:.1f}"
+            h = f"{store.h[node]:.1f}"
             f = f"{f_scores[node]:.1f}"
             score_labels[node] = f"G: {g}\nH: {h}\nF: {f}"
 
     nx.draw_networkx_labels(G, score_pos_offset, labels=score_labels, font_size=7, font_color='darkred', ax=ax)
 
     ax.set_title(step_title, fontsize=14)
-    st.pyplot(fig)
+    return fig
 
 
-def draw_grid_maze_with_scent(maze_grid, node_id_to_grid_pos, start_node_id, goal_node_id, 
-                              path_so_far_node_ids=[], heuristic_data={}):
+def draw_grid_maze_with_scent(maze_grid, store, start_node_id, goal_node_id, 
+                              path_so_far_node_ids=[]):
     R, C = len(maze_grid), len(maze_grid[0])
-    fig, ax = plt.subplots(figsize=(C, R)) 
+    fig = Figure(figsize=(C, R))
+    ax = fig.subplots()
     ax.set_aspect('equal', adjustable='box')
     ax.set_xlim(-0.5, C - 0.5) 
     ax.set_ylim(R - 0.5, -0.5) 
     ax.axis('off')
 
-    max_h = max(heuristic_data.values()) if heuristic_data else 1
+    max_h = store.max_h() or 1
     
     # Custom colormap for 'scent' (heuristic value)
     colors = ["#FFFACD", "#FFD700", "#FFA500", "#FF8C00"] # Light yellow to dark orange
@@ -308,19 +437,10 @@ def draw_grid_maze_with_scent(maze_grid, node_id_to_grid_pos, start_node_id, goa
     for r in range(R):
         for c in range(C):
             if maze_grid[r][c] == 0:
-                node_id = None
-                for nid, gpos in node_id_to_grid_pos.items():
-                    if gpos == (r,c):
-                        node_id = nid
-                        break
-                
-                if node_id is not None and node_id in heuristic_data:
-                    h_val = heuristic_data[node_id]
-                    # Color based on heuristic: closer to goal (lower H) is brighter (more appealing 'scent')
-                    color = scent_cmap(1 - (h_val / max_h)) 
-                    ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, facecolor=color, edgecolor='none', zorder=0))
-                else:
-                    ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, facecolor='lightgray', edgecolor='none', zorder=0))
+                h_val = store.h[store.node_id(r, c)]
+                # Color based on heuristic: closer to goal (lower H) is brighter (more appealing 'scent')
+                color = scent_cmap(1 - (h_val / max_h)) 
+                ax.add_patch(plt.Rectangle((c - 0.5, r - 0.5), 1, 1, facecolor=color, edgecolor='none', zorder=0))
 
     for r in range(R):
         for c in range(C):
@@ -329,25 +449,126 @@ def draw_grid_maze_with_scent(maze_grid, node_id_to_grid_pos, start_node_id, goa
 
     # Draw the path so far
     if len(path_so_far_node_ids) > 1:
-        path_grid_coords = [node_id_to_grid_pos[nid] for nid in path_so_far_node_ids if nid in node_id_to_grid_pos]
+        path_grid_coords = [store.grid_pos(nid) for nid in path_so_far_node_ids]
         path_x = [c for r, c in path_grid_coords]
         path_y = [r for r, c in path_grid_coords]
         # Draw path line
         ax.plot(path_x, path_y, color='red', linewidth=3, marker='o', markersize=8, markerfacecolor='red', markeredgecolor='darkred', zorder=4)
 
     # Highlight the current position (the mouse)
-    if path_so_far_node_ids and path_so_far_node_ids[-1] in node_id_to_grid_pos:
-        current_node_id = path_so_far_node_ids[-1]
-        current_r, current_c = node_id_to_grid_pos[current_node_id]
+    if path_so_far_node_ids:
+        current_r, current_c = store.grid_pos(path_so_far_node_ids[-1])
         ax.add_patch(plt.Rectangle((current_c - 0.4, current_r - 0.4), 0.8, 0.8, facecolor='red', edgecolor='darkred', lw=1.5, zorder=5))
 
     # Highlight the goal (the cheese)
-    if goal_node_id is not None and goal_node_id in node_id_to_grid_pos:
-        goal_r, goal_c = node_id_to_grid_pos[goal_node_id]
+    if goal_node_id is not None:
+        goal_r, goal_c = store.grid_pos(goal_node_id)
         ax.plot(goal_c, goal_r, marker='o', markersize=20, color='green', markeredgecolor='darkgreen', lw=2, zorder=5)
     
     ax.set_title("Maze Map: Mouse Progress & Scent", fontsize=14)
-    st.pyplot(fig)
+    return fig
+
+
+def figure_to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def maze_fingerprint(maze_config):
+    """Stable hash of a maze layout, used to key cached frames."""
+    key = repr((maze_config["grid"], maze_config["start"], maze_config["goal"]))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def render_step_frame(view, maze_grid, G, store, start, goal, history, step):
+    """Rasterizes one view ('maze' or 'graph') of a history step to PNG bytes."""
+    state = history[step - 1]
+    if view == 'maze':
+        fig = draw_grid_maze_with_scent(maze_grid, store, start, goal, path_so_far_node_ids=state['path'])
+    else:
+        fig = draw_graph_a_star(
+            G, store, start, goal,
+            current=state['current'],
+            open_set=state['open_set'],
+            closed_set=state['closed_set'],
+            # Show final path only on the last step
+            final_path=state['path'] if step == len(history) and goal == state['current'] else [],
+            g_scores=state['g_score'],
+            f_scores=state['f_score'],
+            step_title=f"A* Search: Step {step}"
+        )
+    return figure_to_png(fig)
+
+
+class StepFrameCache:
+    """Bounded LRU of PNG frames keyed by (maze hash, step, view).
+
+    Neighbouring steps are rendered ahead of time on a single background
+    thread. Rendering is serialized with a lock because matplotlib's text
+    rendering is not thread-safe.
+    """
+
+    def __init__(self, max_frames=FRAME_CACHE_SIZE):
+        self.max_frames = max_frames
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-prefetch")
+
+    def _lookup(self, key):
+        with self._lock:
+            png = self._frames.get(key)
+            if png is not None:
+                self._frames.move_to_end(key)
+            return png
+
+    def _store(self, key, png):
+        with self._lock:
+            self._frames[key] = png
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        png = self._lookup(key)
+        if png is None:
+            with self._render_lock:
+                # A prefetch may have finished while we waited for the lock
+                png = self._lookup(key)
+                if png is None:
+                    png = render()
+                    self._store(key, png)
+        return png
+
+    def prefetch(self, maze_hash, step, max_step, views, render_step):
+        """Queues steps within PREFETCH_RADIUS of `step` that are not cached yet."""
+        for offset in range(1, PREFETCH_RADIUS + 1):
+            for neighbour in (step + offset, step - offset):
+                if not 1 <= neighbour <= max_step:
+                    continue
+                for view in views:
+                    key = (maze_hash, neighbour, view)
+                    with self._lock:
+                        if key in self._frames or key in self._pending:
+                            continue
+                        self._pending.add(key)
+                    self._executor.submit(self._prefetch_one, key, render_step)
+
+    def _prefetch_one(self, key, render_step):
+        try:
+            _, step, view = key
+            self.get_or_render(key, lambda: render_step(step, view))
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+@st.cache_resource
+def get_frame_cache():
+    # Shared across reruns and sessions so scrubbing hits frames rendered earlier
+    return StepFrameCache()
 
 # ---------------------------
 # 5. Maze Navigation & Step callbacks (FIXED - st.experimental_rerun -> st.rerun)
@@ -396,11 +617,10 @@ def main():
     GOAL_POS_GRID = current_maze_config["goal"]
 
     # Convert grid -> graph and heuristics
-    G, START_NODE, GOAL_NODE, node_labels, pos, heuristic_data_full, node_id_to_grid_pos = \
-        convert_grid_to_graph(MAZE_GRID, START_POS_GRID, GOAL_POS_GRID)
+    G, START_NODE, GOAL_NODE, store = convert_grid_to_graph(MAZE_GRID, START_POS_GRID, GOAL_POS_GRID)
 
     # Run A*
-    final_path, history, equation_df = a_star_search(G, START_NODE, GOAL_NODE)
+    final_path, history, equation_df = a_star_search(G, START_NODE, GOAL_NODE, store)
 
     # history length guard
     max_steps = len(history)
@@ -485,36 +705,26 @@ def main():
         st.error("A* search failed to run. Please check the maze configuration for connectivity.")
         return
 
-    # Retrieve current state safely
-    current_state = history[st.session_state.current_step - 1]
-
     col_main_viz, col_equation_history = st.columns([3, 1])
 
+    frame_cache = get_frame_cache()
+    maze_hash = maze_fingerprint(current_maze_config)
+    current_step = st.session_state.current_step
+
+    def render_step(step, view):
+        return render_step_frame(view, MAZE_GRID, G, store, START_NODE, GOAL_NODE, history, step)
+
     with col_main_viz:
         st.subheader(f"🧀 Maze Map: {current_maze_config['name']}")
-        draw_grid_maze_with_scent(
-            MAZE_GRID,
-            node_id_to_grid_pos,
-            START_NODE,
-            GOAL_NODE,
-            path_so_far_node_ids=current_state['path'],
-            heuristic_data=heuristic_data_full
-        )
+        st.image(frame_cache.get_or_render((maze_hash, current_step, 'maze'), lambda: render_step(current_step, 'maze')))
 
         st.markdown("---")
 
         st.subheader("🗺️ A* Graph Visualization")
-        draw_graph_a_star(
-            G, pos, START_NODE, GOAL_NODE, node_labels,
-            current=current_state['current'],
-            open_set=current_state['open_set'],
-            closed_set=current_state['closed_set'],
-            # Show final path only on the last step
-            final_path=current_state['path'] if st.session_state.current_step == st.session_state.history_len and GOAL_NODE == current_state['current'] else [],
-            g_scores=current_state['g_score'],
-            f_scores=current_state['f_score'],
-            step_title=f"A* Search: Step {st.session_state.current_step}"
-        )
+        st.image(frame_cache.get_or_render((maze_hash, current_step, 'graph'), lambda: render_step(current_step, 'graph')))
+
+    # Warm the frames for the steps the user is most likely to click to next
+    frame_cache.prefetch(maze_hash, current_step, len(history), ('maze', 'graph'), render_step)
 
     with col_equation_history:
         st.subheader("📊 A* Equation History")
@@ -541,5 +751,25 @@ def main():
         else:
             st.warning("Equation data for this step is not available yet.")
 
+    st.markdown("---")
+    with st.expander("⚡ Low-Memory Solver (IDA*)"):
+        st.markdown(
+            """
+            **Iterative-deepening A\*** repeats a depth-first search with a growing $F(n)$ limit.
+            It only keeps the current path in memory, at the cost of re-expanding nodes on every iteration.
+            """
+        )
+        tt_size = st.number_input("Transposition table size (0 = off)", min_value=0, max_value=100000, value=0, step=16)
+        ida_path, ida_stats = ida_star_search(store, START_NODE, GOAL_NODE, tt_size=tt_size)
+
+        col_it, col_exp, col_depth, col_len = st.columns(4)
+        col_it.metric("Iterations", ida_stats['iterations'])
+        col_exp.metric("Expansions", ida_stats['expansions'])
+        col_depth.metric("Max Depth", ida_stats['max_depth'])
+        col_len.metric("Path Length (Nodes)", len(ida_path) if ida_path else "—")
+
+        if st.button("Compare A* vs IDA* on all mazes"):
+            st.dataframe(compare_solvers(MAZE_CONFIGS, tt_size=tt_size), use_container_width=True, hide_index=True)
+
 if __name__ == "__main__":
     main()
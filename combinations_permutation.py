@@ -1,5 +1,17 @@
 import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+import os
 import math
+import time
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from decimal import Decimal, Context
+from fractions import Fraction
+from functools import lru_cache
+from combinations_verifier import count_chunk
+from spawn_pool import start_pool
 
 # --- App Configuration ---
 st.set_page_config(
@@ -9,24 +21,1008 @@ st.set_page_config(
 )
 
 ## --- Mathematical Functions (Kept for calculator/solver pages) ---
+# Above this k (and k >= n / LEGENDRE_N_RATIO) the prime-factorization path beats plain products
+LEGENDRE_MIN_K = 2000
+LEGENDRE_N_RATIO = 50
+
+_PRIME_CACHE = {"limit": 1, "primes": []}
+
+def _primes_up_to(n):
+    """Primes <= n from a sieve that is cached and only ever grown."""
+    if n > _PRIME_CACHE["limit"]:
+        limit = max(n, 2 * _PRIME_CACHE["limit"])
+        sieve = bytearray([1]) * (limit + 1)
+        sieve[:2] = b"\0\0"
+        for p in range(2, math.isqrt(limit) + 1):
+            if sieve[p]:
+                sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+        _PRIME_CACHE["limit"] = limit
+        _PRIME_CACHE["primes"] = [i for i, is_prime in enumerate(sieve) if is_prime]
+    primes = _PRIME_CACHE["primes"]
+    return primes[:bisect_right(primes, n)]
+
+def _product(values, lo=0, hi=None):
+    """Balanced (binary-splitting) product, so bignum multiplies stay similar in size."""
+    if hi is None:
+        hi = len(values)
+    if hi - lo <= 16:
+        result = 1
+        for i in range(lo, hi):
+            result *= values[i]
+        return result
+    mid = (lo + hi) // 2
+    return _product(values, lo, mid) * _product(values, mid, hi)
+
+def _legendre_exponent(m, p):
+    """Exponent of the prime p in m! (Legendre's formula)."""
+    e = 0
+    while m:
+        m //= p
+        e += m
+    return e
+
+def _factorial_quotient(n, parts):
+    """n! / prod(m! for m in parts) via prime factorization, for exact quotients only."""
+    powers = []
+    for p in _primes_up_to(n):
+        e = _legendre_exponent(n, p) - sum(_legendre_exponent(m, p) for m in parts)
+        if e:
+            powers.append(p if e == 1 else p ** e)
+    return _product(powers)
+
+def _use_legendre(n, k):
+    return k >= LEGENDRE_MIN_K and k * LEGENDRE_N_RATIO >= n
+
+@lru_cache(maxsize=256)
 def combinations(n, k):
     """Calculates C(n, k)."""
     if k < 0 or k > n:
         return 0
-    return math.factorial(n) // (math.factorial(k) * math.factorial(n - k))
+    k = min(k, n - k)
+    if _use_legendre(n, k):
+        return _factorial_quotient(n, (k, n - k))
+    return _product(range(n - k + 1, n + 1)) // math.factorial(k)
 
+@lru_cache(maxsize=256)
 def permutations(n, k):
-    """Calculates P(n, k)."""
+    """Calculates P(n, k) as the falling factorial n (n - 1) ... (n - k + 1)."""
     if k < 0 or k > n:
         return 0
-    return math.factorial(n) // math.factorial(n - k)
+    # The result itself has ~k log n bits, so a balanced product is already near-optimal
+    return _product(range(n - k + 1, n + 1))
 
 def stars_and_bars(n, k):
     """Calculates Stars and Bars (ways to place n identical items into k distinct bins)."""
     # Formula for non-negative integer solutions: C(n + k - 1, k - 1)
     return combinations(n + k - 1, k - 1)
 
+## --- Bounded Stars and Bars (lower/upper limits per bin) ---
+def _binomials_down(n_free, r):
+    """[C(r, r), C(r + 1, r), ..., C(r + n_free, r)] by the ratio recurrence."""
+    values = [1]
+    for m in range(r + 1, r + n_free + 1):
+        values.append(values[-1] * m // (m - r))
+    return values
+
+def _bounded_by_inclusion_exclusion(n_free, caps, k):
+    # Numerator prod (1 - x^(c+1)) of the generating function prod (1 - x^(c+1)) / (1 - x)^k,
+    # expanded one group of equal caps at a time; its coefficients are at most 2^len(caps)
+    numerator = np.zeros(n_free + 1, dtype=np.int64 if len(caps) < 62 else object)
+    numerator[0] = 1
+    top = 0  # highest degree that can be non-zero so far
+    for cap, m in Counter(caps).items():
+        step = cap + 1
+        expanded = numerator.copy()
+        for j in range(1, min(m, n_free // step) + 1):
+            shift = j * step
+            width = min(top + 1, n_free + 1 - shift)
+            expanded[shift:shift + width] += (-1) ** j * math.comb(m, j) * numerator[:width]
+        numerator = expanded
+        top = min(n_free, top + m * step)
+    # Coefficient of x^(n_free - d) in (1 - x)^-k is C(n_free - d + k - 1, k - 1)
+    binomials = np.array(_binomials_down(n_free, k - 1), dtype=object)
+    return int(np.dot(numerator[::-1].astype(object), binomials))
+
+def _bounded_by_convolution(n_free, caps, k):
+    # Multiply by 1 + x + ... + x^cap as a prefix sum minus its shift by cap + 1
+    fits_int64 = math.comb(n_free + k - 1, k - 1).bit_length() < 63
+    poly = np.zeros(n_free + 1, dtype=np.int64 if fits_int64 else object)
+    poly[0] = 1
+    for cap in caps:
+        prefix = np.cumsum(poly)
+        poly = prefix.copy()
+        if cap + 1 <= n_free:
+            poly[cap + 1:] -= prefix[:n_free - cap]
+    # Unbounded bins contribute (1 - x)^-u: read off the coefficient directly
+    unbounded = k - len(caps)
+    if unbounded == 0:
+        return int(poly[n_free])
+    binomials = _binomials_down(n_free, unbounded - 1)
+    return sum(int(poly[d]) * binomials[n_free - d] for d in range(n_free + 1) if poly[d])
+
+def bounded_stars_and_bars(n, lower=None, upper=None, k=None, method="auto", max_work=None):
+    """Ways to put n identical items into k distinct bins with lower[i] <= x_i <= upper[i].
+
+    `lower`/`upper` are per-bin lists (None entries mean 0 / no limit). Lower
+    limits are removed by pre-filling each bin, leaving caps c_i = upper - lower.
+    Equal caps are cheapest by inclusion-exclusion; many distinct caps are
+    multiplied in as truncated generating polynomials. Both cost up to about
+    n * (number of capped bins) big-integer additions; with `max_work` set,
+    counts that need more coefficient updates than that raise ValueError.
+    """
+    if k is None:
+        k = len(lower if lower is not None else upper)
+    lower = [0] * k if lower is None else [lo or 0 for lo in lower]
+    upper = [None] * k if upper is None else list(upper)
+    n_free = n - sum(lower)
+    caps = [hi - lo for lo, hi in zip(lower, upper) if hi is not None]
+    if n_free < 0 or any(cap < 0 for cap in caps):
+        return 0
+    if k == 0:
+        return 1 if n_free == 0 else 0
+    if len(caps) == k:
+        # Every bin is capped: nothing fits past the total capacity, and x_i -> c_i - x_i
+        # maps the fillings of n_free onto those of sum(caps) - n_free, which may be far smaller
+        capacity = sum(caps)
+        if n_free > capacity:
+            return 0
+        n_free = min(n_free, capacity - n_free)
+    caps = [cap for cap in caps if cap < n_free]  # a cap of at least n_free never binds
+    if not caps:
+        return combinations(n_free + k - 1, k - 1)
+
+    if method == "auto":
+        # Both methods make passes over n_free + 1 coefficients: inclusion-exclusion one per term of
+        # each group of equal caps, the convolution one per capped bin. The convolution also stays
+        # in int64 whenever the answer does.
+        terms = sum(min(m, n_free // (cap + 1)) for cap, m in Counter(caps).items())
+        small_answer = math.comb(n_free + k - 1, k - 1).bit_length() < 63
+        method = "convolution" if len(caps) < terms or (small_answer and len(caps) >= 62) else "inclusion-exclusion"
+    if max_work is not None:
+        passes = len(caps) if method == "convolution" else sum(min(m, n_free // (cap + 1)) for cap, m in Counter(caps).items())
+        if passes * (n_free + 1) > max_work:
+            raise ValueError(f"This needs about {passes * (n_free + 1):,} coefficient updates, over the limit of {max_work:,}.")
+    if method == "inclusion-exclusion":
+        return _bounded_by_inclusion_exclusion(n_free, caps, k)
+    return _bounded_by_convolution(n_free, caps, k)
+
+MAX_BOUNDED_WORK = 5_000_000  # Coefficient updates allowed per count in the app, under ~2 s at worst
+
+## --- Modular Counting (counts mod a prime p) ---
+MOD = 1_000_000_007
+# Factorial tables are precomputed at least this far, and NumPy products need p * p < 2**63
+MIN_MOD_TABLE = 1 << 10
+MAX_BATCH_MODULUS = 1 << 31
+MAX_MOD_TABLE = 1 << 22  # Largest factorial table built (~2 s); n >= p with a large prime would need p entries
+
+@lru_cache(maxsize=None)
+def _is_prime(p):
+    if p < 2:
+        return False
+    return all(p % d for d in range(2, math.isqrt(p) + 1))
+
+@lru_cache(maxsize=8)
+def _mod_tables(limit, p):
+    """Factorials and inverse factorials 0..limit mod p, as int64 arrays."""
+    fact = [1] * (limit + 1)
+    for i in range(1, limit + 1):
+        fact[i] = fact[i - 1] * i % p
+    inv_fact = [1] * (limit + 1)
+    inv_fact[limit] = pow(fact[limit], p - 2, p)
+    for i in range(limit, 0, -1):
+        inv_fact[i - 1] = inv_fact[i] * i % p
+    return np.array(fact, dtype=np.int64), np.array(inv_fact, dtype=np.int64)
+
+def mod_tables(n, p=MOD):
+    """Tables covering 0..n (n < p), rounded up to a power of two so they are reused."""
+    if not _is_prime(p):
+        raise ValueError(f"Modulus {p} must be prime.")
+    if min(n, p - 1) > MAX_MOD_TABLE:
+        raise ValueError(f"This needs factorials mod {p} up to {min(n, p - 1):,}, over the {MAX_MOD_TABLE:,}-entry table limit. "
+                         f"Use n below {MAX_MOD_TABLE:,} or a prime below {MAX_MOD_TABLE:,} (for Lucas' theorem).")
+    limit = min(p - 1, MAX_MOD_TABLE, max(MIN_MOD_TABLE, 1 << max(0, int(n)).bit_length()))
+    return _mod_tables(limit, p)
+
+def combinations_mod_batch(ns, ks, p=MOD):
+    """Vectorized C(n, k) mod p for arrays of queries.
+
+    Queries with n < p are answered from the factorial tables; larger n use
+    Lucas' theorem digit by digit in base p, which needs tables up to p - 1 and
+    is therefore meant for small primes.
+    """
+    if p >= MAX_BATCH_MODULUS:
+        raise ValueError(f"Batch queries need p < {MAX_BATCH_MODULUS} so products fit in int64.")
+    ns = np.asarray(ns, dtype=np.int64)
+    ks = np.asarray(ks, dtype=np.int64)
+    valid = (ks >= 0) & (ks <= ns)
+    n_max = int(ns.max(initial=0))
+    fact, inv_fact = mod_tables(min(n_max, p - 1), p)
+
+    result = np.where(valid, 1, 0).astype(np.int64)
+    n_rest, k_rest = np.where(valid, ns, 0), np.where(valid, ks, 0)
+    # With n < p there is a single base-p digit, so this loop runs once
+    while True:
+        active = (n_rest > 0) & (result != 0)
+        if not active.any():
+            return result
+        n_digit, k_digit = n_rest % p, k_rest % p
+        ok = k_digit <= n_digit
+        k_digit = np.where(ok, k_digit, 0)
+        term = fact[n_digit] * inv_fact[k_digit] % p * inv_fact[n_digit - k_digit] % p
+        result = np.where(active, np.where(ok, result * term % p, 0), result)
+        n_rest, k_rest = n_rest // p, k_rest // p
+
+def combinations_mod(n, k, p=MOD):
+    """C(n, k) mod p for a single query."""
+    if k < 0 or k > n:
+        return 0
+    return int(combinations_mod_batch([n], [k], p)[0])
+
+def permutations_mod(n, k, p=MOD):
+    """P(n, k) mod p: the falling factorial reduces to r (r - 1) ... (r - k + 1) with r = n mod p."""
+    if k < 0 or k > n:
+        return 0
+    r = n % p
+    if k > r:
+        return 0  # n (n - 1) ... (n - k + 1) then passes through a multiple of p
+    if r > MAX_MOD_TABLE and k <= MAX_MOD_TABLE:
+        # No table that large is built; the k factors themselves are few enough
+        result = 1
+        for factor in range(r - k + 1, r + 1):
+            result = result * factor % p
+        return result
+    fact, inv_fact = mod_tables(r, p)
+    # Multiplied as Python ints: the int64 product of two residues overflows once p passes ~2**31.5
+    return int(fact[r]) * int(inv_fact[r - k]) % p
+
+def stars_and_bars_mod(n, k, p=MOD):
+    """Stars and Bars mod p: C(n + k - 1, k - 1) mod p."""
+    return combinations_mod(n + k - 1, k - 1, p)
+
+def benchmark_mod_queries(num_queries=1_000_000, max_n=1_000_000, p=MOD, seed=0):
+    """Answers num_queries random C(n, k) mod p queries; returns (build seconds, query seconds)."""
+    rng = np.random.default_rng(seed)
+    ns = rng.integers(0, max_n + 1, size=num_queries)
+    ks = (rng.random(num_queries) * (ns + 1)).astype(np.int64)
+    t0 = time.perf_counter()
+    mod_tables(min(max_n, p - 1), p)
+    t1 = time.perf_counter()
+    combinations_mod_batch(ns, ks, p)
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1
+
+# Kept to a few seconds in total: C(10^6, 5 * 10^5) alone holds the page for ~15 s in math.comb
+BENCHMARK_CASES = [
+    ("C", 1000, 500), ("C", 100_000, 50_000), ("C", 1_000_000, 5_000), ("C", 1_000_000, 50_000),
+    ("P", 1000, 500), ("P", 100_000, 5_000), ("P", 1_000_000, 5_000),
+]
+
+def benchmark_counting(cases=BENCHMARK_CASES):
+    """Times the counting engine (uncached) against math.comb / math.perm."""
+    engines = {"C": (combinations.__wrapped__, math.comb), "P": (permutations.__wrapped__, math.perm)}
+    rows = []
+    for label, n, k in cases:
+        ours, reference = engines[label]
+        t0 = time.perf_counter()
+        value = ours(n, k)
+        t1 = time.perf_counter()
+        expected = reference(n, k)
+        t2 = time.perf_counter()
+        rows.append({
+            "Formula": f"{label}({n}, {k})",
+            "Bits": value.bit_length(),
+            "Engine (ms)": round((t1 - t0) * 1000, 2),
+            "Reference": f"math.{reference.__name__}",
+            "Reference (ms)": round((t2 - t1) * 1000, 2),
+            "Match": value == expected,
+        })
+    return rows
+
+## --- Uniform Random Sampling (no enumeration) ---
+# Single draws are O(k) time and memory whatever n is; batch draws are vectorized over the
+# batch with a seeded NumPy Generator and return one object per row.
+def sample_combination(n, k, rng):
+    """A uniform k-combination of range(n) by Floyd's algorithm, as a sorted tuple."""
+    chosen = set()
+    for j in range(n - k, n):
+        t = int(rng.integers(0, j + 1))
+        chosen.add(j if t in chosen else t)
+    return tuple(sorted(chosen))
+
+def sample_permutation(n, k, rng):
+    """A uniform k-permutation of range(n): a partial Fisher-Yates shuffle with only the swaps stored."""
+    swapped = {}
+    result = []
+    for i in range(k):
+        j = int(rng.integers(i, n))
+        result.append(swapped.get(j, j))
+        swapped[j] = swapped.get(i, i)
+    return tuple(result)
+
+def sample_distribution(n, k, rng):
+    """A uniform way to put n identical stars into k bins, as bin counts."""
+    if k == 0:
+        return ()
+    bars = sample_combination(n + k - 1, k - 1, rng)
+    edges = (-1,) + bars + (n + k - 1,)
+    return tuple(edges[i + 1] - edges[i] - 1 for i in range(k))
+
+def sample_combinations_batch(n, k, size, rng):
+    """`size` independent uniform k-combinations, shape (size, k), each row sorted.
+
+    Floyd's algorithm run on every row at once: k vectorized steps, no population,
+    though the membership test makes the work O(size * k^2).
+    """
+    chosen = np.empty((size, k), dtype=np.int64)
+    for i, j in enumerate(range(n - k, n)):
+        t = rng.integers(0, j + 1, size=size)
+        already = (chosen[:, :i] == t[:, None]).any(axis=1)
+        chosen[:, i] = np.where(already, j, t)
+    chosen.sort(axis=1)
+    return chosen
+
+def sample_permutations_batch(n, k, size, rng):
+    """`size` independent uniform k-permutations: a random subset in a random order."""
+    return rng.permuted(sample_combinations_batch(n, k, size, rng), axis=1)
+
+def sample_distributions_batch(n, k, size, rng):
+    """`size` independent uniform Stars and Bars distributions, shape (size, k)."""
+    bars = sample_combinations_batch(n + k - 1, k - 1, size, rng)
+    edges = np.hstack([np.full((size, 1), -1), bars, np.full((size, 1), n + k - 1)])
+    return np.diff(edges, axis=1) - 1
+
+## --- Brute-Force Verification of Problem Specs ---
+# A spec describes a counting problem declaratively: which items, how many are chosen,
+# whether order matters, whether items may repeat, and optional constraints such as
+# ("starts_with", ["A", "E"]), ("includes", [...]), ("excludes", [...]) or
+# ("not_adjacent", ["A", "B"]). The brute force (combinations_verifier.py) lists candidates
+# with itertools and the closed form is worked out from formulas, so neither side reuses
+# the other's code.
+PROBLEM_BANK = [
+    {"name": "Problem 18: 3-letter words from A-E", "items": list("ABCDE"), "choose": 3, "ordered": True, "repetition": False},
+    {"name": "Problem 16: 3 of 5 fruits", "items": ["Apple", "Banana", "Cherry", "Date", "Elderberry"], "choose": 3,
+     "ordered": False, "repetition": False},
+    {"name": "4-digit PINs", "items": list("0123456789"), "choose": 4, "ordered": True, "repetition": True},
+    {"name": "Words from A-E starting with a vowel", "items": list("ABCDE"), "choose": 3,
+     "ordered": True, "repetition": False, "constraints": [("starts_with", ["A", "E"])]},
+    {"name": "Seatings of 9 where A and B are apart", "items": list("ABCDEFGHI"), "choose": 9,
+     "ordered": True, "repetition": False, "constraints": [("not_adjacent", ["A", "B"])]},
+    {"name": "5-person committees from 12 including Alice", "items": ["Alice"] + [f"P{i}" for i in range(2, 13)],
+     "choose": 5, "ordered": False, "repetition": False, "constraints": [("includes", ["Alice"])]},
+    {"name": "Scoops: 4 from 6 flavours", "items": list("VCSMLP"), "choose": 4, "ordered": False, "repetition": True},
+    {"name": "PINs without the digit 0", "items": list("0123456789"), "choose": 4, "ordered": True, "repetition": True,
+     "constraints": [("excludes", ["0"])]},
+    {"name": "Codes of 5 from A-D with no A next to B", "items": list("ABCD"), "choose": 5, "ordered": True, "repetition": True,
+     "constraints": [("not_adjacent", ["A", "B"])]},
+]
+VERIFY_CHUNK_SIZE = 20_000
+VERIFY_POOL_MIN = 100_000    # Specs with fewer candidates are counted in-process; handing them to workers costs more
+VERIFY_CHUNKS_PER_WORKER = 4  # Several chunks per worker, so one slow chunk does not leave the others idle
+
+def spec_kind(spec):
+    if spec["ordered"]:
+        return "Permutations with Repetition" if spec["repetition"] else "Permutations"
+    return "Combinations with Repetition" if spec["repetition"] else "Combinations"
+
+def _not_adjacent_count(n, k, a_and_b_present, repetition):
+    """Ordered arrangements of k from n items in which two given items are never next to each other."""
+    if not a_and_b_present:
+        return permutations(n, k) if not repetition else n ** k
+    if not repetition:
+        # Minus those with the pair side by side: k - 1 places for the pair, 2 orders, the rest filled
+        return permutations(n, k) - 2 * (k - 1) * permutations(n - 2, k - 2) if k >= 2 else permutations(n, k)
+    # Sequences by their last item: A may not follow B and B may not follow A
+    if k == 0:
+        return 1
+    ends_a, ends_b, ends_other = 1, 1, n - 2
+    for _ in range(k - 1):
+        ends_a, ends_b, ends_other = ends_a + ends_other, ends_b + ends_other, (n - 2) * (ends_a + ends_b + ends_other)
+    return ends_a + ends_b + ends_other
+
+def closed_form_count(spec):
+    """The spec's count from formulas alone; specs may carry at most one constraint."""
+    items, k = spec["items"], spec["choose"]
+    n = len(items)
+
+    def count(m):
+        # Arrangements of k from m items, ignoring constraints
+        if spec["ordered"]:
+            return m ** k if spec["repetition"] else permutations(m, k)
+        if spec["repetition"]:
+            return combinations(m + k - 1, k) if k else 1  # multisets: k stars among m bins
+        return combinations(m, k)
+
+    constraints = spec.get("constraints", [])
+    if not constraints:
+        return count(n)
+    if len(constraints) > 1:
+        raise ValueError("Closed forms are worked out for at most one constraint.")
+    (name, values), = constraints
+    present = len(set(values) & set(items))
+    if name == "excludes":
+        return count(n - present)
+    if name == "includes":
+        if present < len(set(values)):
+            return 0
+        # Inclusion-exclusion over which of the required items are left out
+        return sum((-1) ** j * math.comb(present, j) * count(n - j) for j in range(present + 1))
+    if spec["ordered"] and name in ("starts_with", "ends_with"):
+        # One of the allowed items in the first (last) place, anything allowed in the rest
+        if k == 0:
+            return 0
+        return present * ((n ** (k - 1)) if spec["repetition"] else permutations(n - 1, k - 1))
+    if spec["ordered"] and name == "not_adjacent":
+        a, b = values
+        return _not_adjacent_count(n, k, a != b and present == 2, spec["repetition"])
+    raise ValueError(f"No closed form for {name} on {spec_kind(spec).lower()}.")
+
+@st.cache_resource
+def get_verify_pool():
+    # Kept across reruns, since every spawned worker starts a fresh interpreter
+    return start_pool(os.cpu_count() or 1)
+
+def verify_problem(spec, pool=None, workers=1, chunk_size=VERIFY_CHUNK_SIZE):
+    """Counts the candidates meeting the constraints by brute force and checks the closed form.
+
+    Specs with at least VERIFY_POOL_MIN candidates are cut into (spec, start, stop) slices that
+    `pool`'s workers list and count; smaller ones, or any spec without a pool, run in-process.
+    """
+    # The uncounted total only places the cuts: the last slice runs to the end of the list
+    total = ARRANGEMENT_KINDS[spec_kind(spec)][0](len(spec["items"]), spec["choose"])
+    if pool is None or workers < 2 or total < VERIFY_POOL_MIN:
+        pool, workers = None, 1
+    size = max(chunk_size, -(-total // (workers * VERIFY_CHUNKS_PER_WORKER)))
+    cuts = list(range(0, total, size))[1:]
+    tasks = [(spec, start, stop) for start, stop in zip([0] + cuts, cuts + [None])]
+    t0 = time.perf_counter()
+    counts = list(pool.map(count_chunk, tasks) if pool is not None else map(count_chunk, tasks))
+    elapsed = time.perf_counter() - t0
+    listed, found = sum(c for c, _ in counts), sum(f for _, f in counts)
+    expected = closed_form_count(spec)
+    return {
+        "Problem": spec["name"],
+        "Candidates": listed,
+        "Brute Force": found,
+        "Closed Form": expected,
+        "Match": found == expected,
+        "Chunks": len(tasks),
+        "Workers": workers,
+        "Seconds": round(elapsed, 3),
+        "Candidates / s": int(listed / elapsed) if elapsed > 0 else None,
+    }
+
+## --- Counting Library (tables grown on demand) ---
+class GrowingSequence:
+    """a(0), a(1), ... kept in a list and extended by a recurrence only when asked for more."""
+
+    def __init__(self, initial, step):
+        self.values = list(initial)
+        self._step = step  # step(values, n) -> a(n), given a(0)..a(n-1)
+        self._lock = threading.Lock()
+
+    def __call__(self, n):
+        if n >= len(self.values):
+            with self._lock:
+                while len(self.values) <= n:
+                    self.values.append(self._step(self.values, len(self.values)))
+        return self.values[n]
+
+
+class GrowingTriangle:
+    """T(n, k) for 0 <= k <= n in one flat list; row n starts at n (n + 1) / 2."""
+
+    def __init__(self, step):
+        self.cells = [1]
+        self.rows = 1
+        self._step = step  # step(n, k, previous_row) -> T(n, k)
+        self._lock = threading.Lock()
+
+    def row(self, n):
+        if n >= self.rows:
+            with self._lock:
+                while self.rows <= n:
+                    m = self.rows
+                    previous = self.cells[(m - 1) * m // 2:]
+                    self.cells.extend(self._step(m, k, previous) for k in range(m + 1))
+                    self.rows += 1
+        start = n * (n + 1) // 2
+        return self.cells[start:start + n + 1]
+
+    def __call__(self, n, k):
+        if k < 0 or k > n:
+            return 0
+        self.row(n)
+        return self.cells[n * (n + 1) // 2 + k]
+
+
+def _triangle_cell(row, k):
+    return row[k] if 0 <= k < len(row) else 0
+
+def _partition_step(p, n):
+    # Euler's pentagonal number theorem
+    total, j = 0, 1
+    while True:
+        g1, g2 = j * (3 * j - 1) // 2, j * (3 * j + 1) // 2
+        if g1 > n:
+            return total
+        sign = 1 if j % 2 else -1
+        total += sign * (p[n - g1] + (p[n - g2] if g2 <= n else 0))
+        j += 1
+
+@st.cache_resource
+def counting_library():
+    """Shared tables, kept across reruns so repeated queries are O(1) lookups."""
+    stirling2 = GrowingTriangle(lambda n, k, prev: _triangle_cell(prev, k - 1) + k * _triangle_cell(prev, k))
+    return {
+        "factorial": GrowingSequence([1], lambda f, n: f[n - 1] * n),
+        "derangements": GrowingSequence([1, 0], lambda d, n: (n - 1) * (d[n - 1] + d[n - 2])),
+        # Unsigned Stirling numbers of the first kind: permutations of n with k cycles
+        "stirling1": GrowingTriangle(lambda n, k, prev: _triangle_cell(prev, k - 1) + (n - 1) * _triangle_cell(prev, k)),
+        "stirling2": stirling2,
+        "bell": GrowingSequence([1], lambda b, n: sum(stirling2.row(n))),
+        "partitions": GrowingSequence([1], _partition_step),
+    }
+
+def multiset_permutations(counts):
+    """Arrangements of a multiset with the given repeat counts: n! / (m1! m2! ...)."""
+    factorial = counting_library()["factorial"]
+    result = factorial(sum(counts))
+    for m in counts:
+        result //= factorial(m)
+    return result
+
+def derangements(n):
+    """Permutations of n items with no item in its original place."""
+    return counting_library()["derangements"](n)
+
+def stirling_first(n, k):
+    """Unsigned Stirling number of the first kind: permutations of n items with exactly k cycles."""
+    return counting_library()["stirling1"](n, k)
+
+def stirling_second(n, k):
+    """Stirling number of the second kind: partitions of n items into k non-empty groups."""
+    return counting_library()["stirling2"](n, k)
+
+def bell_number(n):
+    """Partitions of n items into any number of non-empty groups."""
+    return counting_library()["bell"](n)
+
+def integer_partitions(n):
+    """Ways to write n as a sum of positive integers, ignoring order."""
+    return counting_library()["partitions"](n)
+
+## --- Batch Tables (whole ranges of n and k at once) ---
+# Exact int64 values are kept while they fit in this many bits; larger counts stay in log space
+EXACT_BITS = 60
+# Heatmaps up to this many cells also carry exact values in their hover text
+HOVER_TEXT_CELLS = 40_000
+TABLE_FORMULAS = ("C(n, k)", "P(n, k)", "Stars and Bars")
+
+def _log10_comb(log_fact, n, k):
+    valid = (k >= 0) & (k <= n)
+    n_safe = np.where(valid, n, 0)
+    k_safe = np.where(valid, k, 0)
+    return np.where(valid, log_fact[n_safe] - log_fact[k_safe] - log_fact[n_safe - k_safe], -np.inf)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def counting_tables(n_max, k_max):
+    """C(n, k), P(n, k) and Stars and Bars for n = 0..n_max and k = 0..k_max.
+
+    Returns {formula: (log10 table, exact table)}. Log tables are float64 with
+    -inf where the count is 0; exact tables are int64 with -1 wherever the count
+    needs more than EXACT_BITS bits.
+    """
+    rows = n_max + k_max  # Stars and Bars reads C(n + k - 1, k - 1)
+    log_fact = np.concatenate(([0.0], np.cumsum(np.log10(np.arange(1, rows + 1)))))
+    n = np.arange(n_max + 1)[:, None]
+    k = np.arange(k_max + 1)[None, :]
+    fits = lambda log_table: log_table < EXACT_BITS * math.log10(2)
+
+    # Exact Pascal triangle, one vectorized row at a time; -1 marks overflowed cells
+    cap = 1 << EXACT_BITS
+    pascal = np.zeros((rows + 1, k_max + 1), dtype=np.int64)
+    pascal[0, 0] = 1
+    for i in range(1, rows + 1):
+        prev = pascal[i - 1]
+        row = prev.copy()
+        row[1:] += prev[:-1]
+        overflow = (prev < 0) | (row >= cap)
+        overflow[1:] |= prev[:-1] < 0
+        row[overflow] = -1
+        pascal[i] = row
+
+    log_c = _log10_comb(log_fact, n, k)
+    exact_c = pascal[:n_max + 1]
+
+    valid = k <= n
+    log_p = np.where(valid, log_fact[n] - log_fact[np.where(valid, n - k, 0)], -np.inf)
+    # Falling factorial along k; cells past EXACT_BITS may have wrapped and are masked out
+    with np.errstate(over="ignore"):
+        exact_p = np.cumprod(np.where(valid & (k >= 1), n - k + 1, 1), axis=1, dtype=np.int64)
+    exact_p = np.where(valid, np.where(fits(log_p), exact_p, -1), 0)
+
+    log_sb = _log10_comb(log_fact, n + k - 1, k - 1)
+    exact_sb = np.where(k >= 1, pascal[np.maximum(n + k - 1, 0), np.maximum(k - 1, 0)], 0)
+
+    return {
+        "C(n, k)": (log_c, exact_c),
+        "P(n, k)": (log_p, exact_p),
+        "Stars and Bars": (log_sb, exact_sb),
+    }
+
+def format_count(log10_value, exact):
+    """Exact digits when available, otherwise scientific notation from the log."""
+    if exact >= 0:
+        return f"{int(exact):,}"
+    if log10_value == -np.inf:
+        return "0"
+    exponent = math.floor(log10_value)
+    return f"≈ {10 ** (log10_value - exponent):.4f} × 10^{exponent}"
+
+def draw_count_heatmap(formula, log_table, exact_table):
+    """Heatmap of log10(count) over the (k, n) grid."""
+    z = np.where(np.isfinite(log_table), log_table, np.nan)
+    heatmap = dict(z=z, colorscale="Viridis", colorbar=dict(title="log₁₀"))
+    if log_table.size <= HOVER_TEXT_CELLS:
+        heatmap["text"] = [[format_count(lv, ev) for lv, ev in zip(log_row, exact_row)]
+                           for log_row, exact_row in zip(log_table, exact_table)]
+        heatmap["hovertemplate"] = "n=%{y}, k=%{x}<br>%{text}<extra></extra>"
+    else:
+        heatmap["hovertemplate"] = "n=%{y}, k=%{x}<br>log₁₀ = %{z:.3f}<extra></extra>"
+    fig = go.Figure(go.Heatmap(**heatmap))
+    fig.update_layout(
+        title=f"{formula} (colour = number of digits)",
+        xaxis_title="k", yaxis_title="n", height=600, template="plotly_white",
+    )
+    return fig
+
+## --- Enumeration, Ranking and Unranking ---
+UNRANK_WALK_STEPS = 64  # Longer jumps evaluate one binomial directly instead of stepping by ratios
+# Objects are tuples of 0-based item indices (or bin counts for Stars and Bars), in
+# lexicographic order matching itertools. Unranking jumps straight to any rank, so
+# paging never builds the earlier objects.
+def unrank_permutation(n, k, rank):
+    """The rank-th k-permutation of n items; O(k^2) work (the used-index scan), independent of n."""
+    used, result = [], []
+    block = permutations(n - 1, k - 1) if k else 1  # arrangements sharing each first choice
+    for i in range(k):
+        j, rank = divmod(rank, block)
+        # j-th smallest index that is not already used
+        index = j
+        for u in used:
+            if u > index:
+                break
+            index += 1
+        insort(used, index)
+        result.append(index)
+        if i < k - 1:
+            block //= n - i - 1
+    return tuple(result)
+
+def rank_permutation(n, indices):
+    k = len(indices)
+    used, rank = [], 0
+    block = permutations(n - 1, k - 1) if k else 1
+    for i, index in enumerate(indices):
+        rank += (index - bisect_left(used, index)) * block
+        insort(used, index)
+        if i < k - 1:
+            block //= n - i - 1
+    return rank
+
+def _log_comb(m, r):
+    return math.lgamma(m + 1) - math.lgamma(r + 1) - math.lgamma(m - r + 1)
+
+def unrank_combination(n, k, rank):
+    """The rank-th k-combination of n items.
+
+    Walks the combinadic keeping C(n - c, r) exact through ratio updates. Each element is first
+    located from a log-gamma estimate, so an element costs at most one `math.comb` (for a long
+    jump) plus a few O(1) ratio steps, instead of a binary search over full binomials.
+    """
+    result, start = [], 0
+    tail = math.comb(n, k) if k else 1  # C(n - start, r): combinations of the remaining elements from `start` on
+    for r in range(k, 0, -1):
+        # The next element is the largest c with C(n - c, r) >= tail - rank, i.e. with at most
+        # `rank` combinations starting before it; C(n - c, r) falls as c grows
+        target = tail - rank
+        log_target = math.log(target)
+        lo, hi = start, n - r
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if _log_comb(n - mid, r) >= log_target:
+                lo = mid
+            else:
+                hi = mid - 1
+        c, value = start, tail
+        if lo - start > UNRANK_WALK_STEPS:
+            c, value = lo, math.comb(n - lo, r)
+        # C(m - 1, r) = C(m, r) (m - r) / m: step forward while the next value still reaches the
+        # target, and back while rounding in the estimate left us past it
+        while c < n - r and value * (n - c - r) // (n - c) >= target:
+            value = value * (n - c - r) // (n - c)
+            c += 1
+        while value < target:
+            c -= 1
+            value = value * (n - c) // (n - c - r)
+        rank -= tail - value
+        result.append(c)
+        tail = value * r // (n - c)  # C(n - c - 1, r - 1)
+        start = c + 1
+    return tuple(result)
+
+def rank_combination(n, indices):
+    k = len(indices)
+    rank, start = 0, 0
+    for i, c in enumerate(indices):
+        rank += math.comb(n - start, k - i) - math.comb(n - c, k - i)
+        start = c + 1
+    return rank
+
+def unrank_multiset(n, k, rank):
+    """The rank-th k-combination with repetition, via c_i -> c_i - i on C(n + k - 1, k)."""
+    return tuple(c - i for i, c in enumerate(unrank_combination(n + k - 1, k, rank)))
+
+def rank_multiset(n, indices):
+    return rank_combination(n + len(indices) - 1, [c + i for i, c in enumerate(indices)])
+
+def _bin_counts(n, k, bars):
+    edges = (-1,) + tuple(bars) + (n + k - 1,)
+    return tuple(edges[i + 1] - edges[i] - 1 for i in range(k))
+
+def _bar_positions(counts):
+    bars, position = [], -1
+    for count in counts[:-1]:
+        position += count + 1
+        bars.append(position)
+    return bars
+
+def unrank_distribution(n, k, rank):
+    """The rank-th way to put n identical stars into k bins, as bin counts (bars = (k-1)-combination)."""
+    return _bin_counts(n, k, unrank_combination(n + k - 1, k - 1, rank))
+
+def unrank_sequence(n, k, rank):
+    """The rank-th length-k sequence with repetition allowed: rank written in base n."""
+    digits = []
+    for _ in range(k):
+        rank, d = divmod(rank, n)
+        digits.append(d)
+    return tuple(reversed(digits))
+
+def rank_sequence(n, indices):
+    rank = 0
+    for index in indices:
+        rank = rank * n + index
+    return rank
+
+def rank_distribution(counts):
+    n, k = sum(counts), len(counts)
+    return rank_combination(n + k - 1, _bar_positions(counts))
+
+# Successors step to the next object in O(k), so a page of arrangements unranks only its first
+# one. Permutations and sequences are cheap enough to unrank row by row (O(k^2) and O(k)).
+def next_combination(n, combo):
+    """The k-combination after `combo` in lexicographic order, or None after the last one."""
+    combo, k = list(combo), len(combo)
+    i = k - 1
+    while i >= 0 and combo[i] == n - k + i:
+        i -= 1
+    if i < 0:
+        return None
+    combo[i:] = range(combo[i] + 1, combo[i] + 1 + k - i)
+    return tuple(combo)
+
+def next_multiset(n, indices):
+    following = next_combination(n + len(indices) - 1, [c + i for i, c in enumerate(indices)])
+    return None if following is None else tuple(c - i for i, c in enumerate(following))
+
+def next_distribution(n, counts):
+    following = next_combination(n + len(counts) - 1, _bar_positions(counts))
+    return None if following is None else _bin_counts(n, len(counts), following)
+
+# kind -> (count function, unrank function, rank function)
+ARRANGEMENT_KINDS = {
+    "Permutations": (permutations, unrank_permutation, rank_permutation),
+    "Permutations with Repetition": (lambda n, k: n ** k, unrank_sequence, rank_sequence),
+    "Combinations": (combinations, unrank_combination, rank_combination),
+    "Combinations with Repetition": (lambda n, k: 1 if k == 0 else combinations(n + k - 1, k), unrank_multiset, rank_multiset),
+    "Stars and Bars": (stars_and_bars, unrank_distribution, lambda n, counts: rank_distribution(counts)),
+}
+ARRANGEMENT_SUCCESSORS = {
+    "Combinations": next_combination,
+    "Combinations with Repetition": next_multiset,
+    "Stars and Bars": next_distribution,
+}
+
+def enumerate_arrangements(kind, n, k, start=0, stop=None):
+    """Lazily yields (rank, object) from rank `start` up to `stop` in constant memory."""
+    count, unrank, _ = ARRANGEMENT_KINDS[kind]
+    successor = ARRANGEMENT_SUCCESSORS.get(kind)
+    stop = count(n, k) if stop is None else min(stop, count(n, k))
+    arrangement = None
+    for rank in range(start, stop):
+        arrangement = unrank(n, k, rank) if arrangement is None or successor is None else successor(n, arrangement)
+        yield rank, arrangement
+
+def describe_arrangement(kind, arrangement, labels):
+    if kind == "Stars and Bars":
+        return " | ".join("★" * c if c <= 10 else f"{c}★" for c in arrangement)
+    return " ".join(labels[i] if i < len(labels) else str(i + 1) for i in arrangement)
+
+## --- Log-Space & Asymptotic Counting (for astronomically large results) ---
+# Counts with more digits than this are shown from their logarithm instead of exactly
+EXACT_DISPLAY_DIGITS = 60
+# Below this n, ln n! is taken from the exact factorial instead of Stirling's series
+STIRLING_MIN_N = 30
+# ln n! = (n + 1/2) ln n - n + ln(2 pi) / 2 + 1/(12 n) - 1/(360 n^3) + 1/(1260 n^5) - 1/(1680 n^7) + ...
+STIRLING_TERMS = ((1, 12), (-1, 360), (1, 1260), (-1, 1680))
+# The series alternates, so the first omitted term, 1/(1188 n^9), bounds the truncation error
+STIRLING_NEXT_DENOMINATOR = 1188
+LN_2PI = Decimal("1.837877066409345483560659472811235279722794947275566825634")
+
+def _count_factorials(formula, n, k):
+    """(top, bottoms) with count = top! / prod(bottom!), or None when the count is 0."""
+    if formula == "Stars and Bars":
+        return (n + k - 1, (k - 1, n)) if k >= 1 else None
+    if k < 0 or k > n:
+        return None
+    return (n, (k, n - k)) if formula == "C(n, k)" else (n, (n - k,))
+
+def log10_count(formula, n, k):
+    """Fast float log10 of C(n, k), P(n, k) or Stars and Bars via log-gamma (-inf when 0)."""
+    factorials = _count_factorials(formula, n, k)
+    if factorials is None:
+        return -math.inf
+    top, bottoms = factorials
+    return (math.lgamma(top + 1) - sum(math.lgamma(b + 1) for b in bottoms)) / math.log(10)
+
+def _ln_factorial(n, context):
+    """(ln n!, absolute error bound) in Decimal arithmetic."""
+    if n < STIRLING_MIN_N:
+        return context.ln(Decimal(math.factorial(n))), Decimal(0)
+    big_n = Decimal(n)
+    value = (big_n + Decimal("0.5")) * context.ln(big_n) - big_n + LN_2PI / 2
+    for j, (sign, denominator) in enumerate(STIRLING_TERMS):
+        value += Decimal(sign) / (denominator * big_n ** (2 * j + 1))
+    return value, 1 / (STIRLING_NEXT_DENOMINATOR * big_n ** 9)
+
+def count_summary(formula, n, k, sig_digits=8):
+    """log10, digit count and leading digits of a count, with a relative error bound.
+
+    Works from Stirling's series in high-precision Decimal arithmetic, so the
+    exact (possibly multi-megabyte) integer is never formed.
+    """
+    factorials = _count_factorials(formula, n, k)
+    if factorials is None:
+        return {"log10": -math.inf, "digits": 1, "leading": "0", "rel_error": 0.0, "latex": "0", "text": "0"}
+    top, bottoms = factorials
+    context = Context(prec=sig_digits + 30 + len(str(top)))
+    ln_value, error = _ln_factorial(top, context)
+    for b in bottoms:
+        ln_b, error_b = _ln_factorial(b, context)
+        ln_value = context.subtract(ln_value, ln_b)
+        error += error_b
+    log10 = context.divide(ln_value, context.ln(Decimal(10)))
+    exponent = int(log10.to_integral_value(rounding="ROUND_FLOOR"))
+    mantissa = context.power(Decimal(10), log10 - exponent)
+    leading = f"{mantissa:.{sig_digits - 1}f}"
+    if leading.startswith("10"):
+        # The mantissa rounded up to 10.000..., so move into the next decade
+        exponent += 1
+        leading = f"{mantissa / 10:.{sig_digits - 1}f}"
+    return {
+        "log10": float(log10),
+        "digits": exponent + 1,
+        "leading": leading,
+        # Truncation bound plus Decimal rounding, which is relative to the size of ln(top!)
+        "rel_error": float(error) + 10.0 ** (len(str(top)) + 3 - context.prec),
+        "latex": r"%s \times 10^{%d}" % (leading, exponent),
+        "text": f"≈ {leading} × 10^{exponent}",
+    }
+
+def count_display(formula, n, k, exact):
+    """(LaTeX right-hand side, metric value, metric help) for a count.
+
+    Counts past EXACT_DISPLAY_DIGITS switch to count_summary, so huge values
+    are never built or formatted digit by digit.
+    """
+    if log10_count(formula, n, k) < EXACT_DISPLAY_DIGITS - 1:
+        value = exact()
+        return f"= {value}", f"{value}", None
+    summary = count_summary(formula, n, k)
+    help_text = f"{summary['digits']:,} digits (Stirling's series, relative error below {summary['rel_error']:.1e})"
+    return r"\approx " + summary["latex"], summary["text"], help_text
+
+def format_big_int(value):
+    """Exact digits for readable integers, scientific notation beyond EXACT_DISPLAY_DIGITS."""
+    if value.bit_length() <= EXACT_DISPLAY_DIGITS * 3:
+        return f"{value}"
+    log10 = math.log10(value)
+    exponent = math.floor(log10)
+    return f"≈ {10 ** (log10 - exponent):.6f} × 10^{exponent}"
+
+## --- Probability (hypergeometric and binomial) ---
+# Populations up to this size also get exact fractions from the counting engine
+EXACT_PROBABILITY_MAX_N = 10_000
+# Charts leave out the far tails where every probability is below this
+CHART_MIN_PROBABILITY = 1e-12
+
+def _distribution_table(k, log_pmf):
+    pmf = np.exp(log_pmf)
+    return {
+        "k": k,
+        "pmf": pmf,
+        "log10_pmf": log_pmf / math.log(10),
+        "cdf": np.minimum(np.cumsum(pmf), 1.0),               # P(X <= k)
+        "at_least": np.minimum(np.cumsum(pmf[::-1])[::-1], 1.0),  # P(X >= k), summed from the tail
+    }
+
+def _log_pmf_from_ratios(log_ratios):
+    """Log PMF from log(pmf[i+1] / pmf[i]).
+
+    Every ratio is a small, well-conditioned number, and normalizing with
+    logsumexp replaces the enormous log C(N, n) term that would otherwise cancel.
+    """
+    log_pmf = np.concatenate(([0.0], np.cumsum(log_ratios)))
+    peak = log_pmf.max()
+    return log_pmf - (peak + math.log(np.exp(log_pmf - peak).sum()))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def hypergeometric_distribution(population, successes, draws):
+    """P(X = k) for k successes when drawing `draws` items without replacement, over the whole support."""
+    k_min, k_max = max(0, draws - (population - successes)), min(draws, successes)
+    k = np.arange(k_min, k_max + 1)
+    prev = k[:-1].astype(float)
+    log_ratios = (np.log(successes - prev) + np.log(draws - prev)
+                  - np.log(prev + 1) - np.log(population - successes - draws + prev + 1))
+    return _distribution_table(k, _log_pmf_from_ratios(log_ratios))
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def binomial_distribution(trials, p):
+    """P(X = k) for k successes in `trials` independent trials with success probability p."""
+    k = np.arange(trials + 1)
+    if p <= 0 or p >= 1:
+        log_pmf = np.full(trials + 1, -np.inf)
+        log_pmf[0 if p <= 0 else trials] = 0.0
+        return _distribution_table(k, log_pmf)
+    prev = k[:-1].astype(float)
+    log_ratios = np.log(trials - prev) - np.log(prev + 1) + math.log(p) - math.log1p(-p)
+    return _distribution_table(k, _log_pmf_from_ratios(log_ratios))
+
+def hypergeometric_pmf_exact(population, successes, draws, k):
+    return Fraction(combinations(successes, k) * combinations(population - successes, draws - k),
+                    combinations(population, draws))
+
+def binomial_pmf_exact(trials, p, k):
+    p = Fraction(str(p))  # the decimal the user typed, not its binary float approximation
+    return combinations(trials, k) * p ** k * (1 - p) ** (trials - k)
+
+def draw_distribution_chart(table, highlight_k, title):
+    """PMF bars with the CDF on a second axis; far tails are trimmed."""
+    keep = table["pmf"] >= CHART_MIN_PROBABILITY
+    keep[np.searchsorted(table["k"], highlight_k)] = True
+    k, pmf, cdf = table["k"][keep], table["pmf"][keep], table["cdf"][keep]
+    colors = np.where(k == highlight_k, "#d62728", "#1f77b4")
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=k, y=pmf, marker_color=colors, name="P(X = k)"))
+    fig.add_trace(go.Scatter(x=k, y=cdf, mode="lines", name="P(X ≤ k)", yaxis="y2", line=dict(color="#ff7f0e")))
+    fig.update_layout(
+        title=title, xaxis_title="k", yaxis_title="P(X = k)", template="plotly_white", height=450,
+        yaxis2=dict(title="P(X ≤ k)", overlaying="y", side="right", range=[0, 1.02]),
+        legend=dict(orientation="h", y=-0.2),
+    )
+    return fig
+
 ## --- Streamlit UI Components ---
+# Largest inputs for the calculator sections that need exact tables or per-bin lists
+MORE_FUNCTIONS_MAX_N = 300
+BOUNDED_MAX_BINS = 5000
+BOUNDED_MAX_ITEMS = 100_000
+SAMPLING_MAX_K = 20
+# Rendered (formula, n, k) sections kept across reruns
+RENDER_CACHE_SIZE = 512
+MONTE_CARLO_DRAWS = 100_000
+
 def display_header():
     """Sets up the main header for the application."""
     st.title("🧮 Permutations & Combinations Interactive Lesson")
@@ -68,36 +1064,219 @@ def display_explanation_page():
     st.latex(r"\text{Ways} = \binom{n + k - 1}{k - 1}")
 
 
+# formula -> (section title, LaTeX template, metric label template, exact count function)
+COUNT_SECTIONS = {
+    # Using raw strings for latex to handle backslashes better
+    "P(n, k)": ("Permutations (Order Matters)",
+                r"P(%(n)d, %(k)d) = \frac{%(n)d!}{(%(n)d - %(k)d)!} %(rhs)s",
+                "P({n}, {k}) Result:", permutations),
+    "C(n, k)": ("Combinations (Order Doesn't Matter)",
+                r"C(%(n)d, %(k)d) = \frac{%(n)d!}{%(k)d!(%(n)d - %(k)d)!} %(rhs)s",
+                "C({n}, {k}) Result:", combinations),
+    # n is items (stars), k is bins (dividers)
+    "Stars and Bars": ("Stars and Bars (Identical Items, Distinct Bins)",
+                       r"\text{Ways} = \binom{%(n)d + %(k)d - 1}{%(k)d - 1} = \binom{%(top)d}{%(bottom)d} %(rhs)s",
+                       "Ways to distribute {n} identical items into {k} bins:", stars_and_bars),
+}
+
+@st.cache_data(max_entries=RENDER_CACHE_SIZE, show_spinner=False)
+def render_count_section(formula, n, k):
+    """Computes the LaTeX and metric text for one formula; repeat (formula, n, k) visits are cache hits."""
+    title, latex_template, label_template, count = COUNT_SECTIONS[formula]
+    rhs, value, help_text = count_display(formula, n, k, lambda: count(n, k))
+    return {
+        "title": title,
+        "latex": latex_template % {"n": n, "k": k, "top": n + k - 1, "bottom": k - 1, "rhs": rhs},
+        "label": label_template.format(n=n, k=k),
+        "value": value,
+        "help": help_text,
+    }
+
+def emit_count_section(section):
+    """Presentation only: writes a section prepared by render_count_section."""
+    st.subheader(section["title"])
+    st.latex(section["latex"])
+    st.metric(label=section["label"], value=section["value"], help=section["help"])
+
 def display_calculator_page():
     """Displays an interactive calculator for students to explore."""
     st.sidebar.info("Viewing Interactive Calculator")
     st.header("2. Interactive Calculator")
     st.write("Explore how changing $n$ (total items) and $k$ (chosen items/bins) affects the result.")
 
+    mode = st.radio("Mode:", ("Single Value", "Table & Heatmap"), horizontal=True)
+    if mode == "Table & Heatmap":
+        display_table_explorer()
+        return
+
+    large_inputs = st.toggle("Allow very large n and k", help="Results too long to print are shown in scientific notation.")
     col1, col2 = st.columns(2)
     with col1:
-        n = st.slider("Total Items (n):", min_value=0, max_value=15, value=5)
+        if large_inputs:
+            n = st.number_input("Total Items (n):", min_value=0, max_value=10 ** 15, value=1_000_000)
+        else:
+            n = st.slider("Total Items (n):", min_value=0, max_value=15, value=5)
     with col2:
-        k = st.slider("Items Chosen/Bins (k):", min_value=0, max_value=max(1, n), value=3)
+        if large_inputs:
+            k = st.number_input("Items Chosen/Bins (k):", min_value=0, max_value=10 ** 15, value=500_000)
+        else:
+            k = st.slider("Items Chosen/Bins (k):", min_value=0, max_value=max(1, n), value=3)
 
     st.markdown("---")
 
-    st.subheader("Permutations (Order Matters)")
-    perm_result = permutations(n, k)
-    # Using raw string for latex to handle backslashes better
-    st.latex(r"P(%d, %d) = \frac{%d!}{(%d - %d)!} = %d" % (n, k, n, n, k, perm_result))
-    st.metric(label=f"P({n}, {k}) Result:", value=f"{perm_result}")
+    for formula in COUNT_SECTIONS:
+        emit_count_section(render_count_section(formula, n, k))
 
-    st.subheader("Combinations (Order Doesn't Matter)")
-    comb_result = combinations(n, k)
-    st.latex(r"C(%d, %d) = \frac{%d!}{%d!(%d - %d)!} = %d" % (n, k, n, k, n, k, comb_result))
-    st.metric(label=f"C({n}, {k}) Result:", value=f"{comb_result}")
+    if 0 < k <= min(n, SAMPLING_MAX_K):
+        display_random_samples(n, k)
 
-    st.subheader("Stars and Bars (Identical Items, Distinct Bins)")
-    sb_result = stars_and_bars(n, k)
-    # n is items (stars), k is bins (dividers)
-    st.latex(r"\text{Ways} = \binom{%d + %d - 1}{%d - 1} = \binom{%d}{%d} = %d" % (n, k, k, n + k - 1, k - 1, sb_result))
-    st.metric(label=f"Ways to distribute {n} identical items into {k} bins:", value=f"{sb_result}")
+    if k > BOUNDED_MAX_BINS or n > BOUNDED_MAX_ITEMS:
+        st.info(f"Per-bin limits are available for up to {BOUNDED_MAX_BINS:,} bins and {BOUNDED_MAX_ITEMS:,} items.")
+    else:
+        display_bounded_stars_and_bars(n, k)
+
+    if n > MORE_FUNCTIONS_MAX_N:
+        st.info(f"Derangements, Stirling, Bell and partition numbers are shown for n up to {MORE_FUNCTIONS_MAX_N}.")
+    else:
+        display_more_counting_functions(n, k)
+
+    display_engine_benchmark()
+    display_modular_counting()
+
+# Sections with their own widgets are fragments: using those widgets reruns only that
+# section, leaving the formulas above untouched.
+@st.fragment
+def display_engine_benchmark():
+    """Benchmark of the counting engine against the standard library."""
+    with st.expander("⚡ Large-n Engine Benchmark"):
+        st.write("Times our counting engine against Python's built-in `math.comb` and `math.perm` for large inputs.")
+        if st.button("Run Benchmark"):
+            st.dataframe(benchmark_counting(), use_container_width=True, hide_index=True)
+
+@st.fragment
+def display_modular_counting():
+    """Counts modulo a prime for arbitrary n and k."""
+    with st.expander("🔢 Modular Counting (mod p)"):
+        st.write("Contest and hashing problems only need counts modulo a prime $p$, which stay small no matter how large $n$ is.")
+        col_n, col_k, col_p = st.columns(3)
+        with col_n:
+            n_mod = st.number_input("n", min_value=0, value=1_000_000, step=1)
+        with col_k:
+            k_mod = st.number_input("k", min_value=0, value=500_000, step=1)
+        with col_p:
+            p_mod = st.number_input("Prime modulus p", min_value=2, value=MOD, step=1)
+        try:
+            st.latex(r"C(%d, %d) \bmod %d = %d" % (n_mod, k_mod, p_mod, combinations_mod(n_mod, k_mod, p_mod)))
+            st.latex(r"P(%d, %d) \bmod %d = %d" % (n_mod, k_mod, p_mod, permutations_mod(n_mod, k_mod, p_mod)))
+        except ValueError as error:
+            st.error(str(error))
+        if st.button("Time 1,000,000 Random Queries"):
+            build_s, query_s = benchmark_mod_queries(p=MOD)
+            st.write(f"Table build: **{build_s * 1000:.0f} ms** (once per modulus), 10^6 queries: **{query_s * 1000:.0f} ms**")
+
+@st.fragment
+def display_bounded_stars_and_bars(n, k):
+    """Stars and Bars where every bin has its own minimum and maximum."""
+    with st.expander("Stars and Bars with limits on each bin"):
+        st.write("Each bin must hold at least a minimum and at most a maximum number of items.")
+        col_lo, col_hi = st.columns(2)
+        with col_lo:
+            min_per_bin = st.number_input("Minimum per bin:", min_value=0, value=0)
+        with col_hi:
+            max_per_bin = st.number_input("Maximum per bin:", min_value=0, value=2)
+            no_max = st.checkbox("No maximum")
+        bin_limits = st.text_input("Or give each bin its own limits, e.g. `0-2, 1-3, 0-`:", value="")
+        try:
+            if bin_limits.strip():
+                bounds = [part.strip().split("-") for part in bin_limits.split(",")]
+                lower = [int(lo) if lo.strip() else 0 for lo, _ in bounds]
+                upper = [int(hi) if hi.strip() else None for _, hi in bounds]
+            else:
+                lower = [min_per_bin] * k
+                upper = [None if no_max else max_per_bin] * k
+        except ValueError:
+            st.error("Write each bin as `min-max`, for example `0-2`, with `max` left blank for no limit.")
+            return
+        try:
+            ways = bounded_stars_and_bars(n, lower, upper, max_work=MAX_BOUNDED_WORK)
+            st.metric(label=f"Ways with {n} items in {len(lower)} bins:", value=format_big_int(ways))
+        except ValueError as error:
+            st.error(f"{error} Try fewer items or fewer capped bins.")
+
+@st.fragment
+def display_random_samples(n, k):
+    """Random practice objects and a Monte Carlo check, drawn without listing the population."""
+    with st.expander("🎲 Random Samples"):
+        seed = st.number_input("Random seed:", min_value=0, value=42)
+        rng = np.random.default_rng(seed)
+        st.markdown(f"* Random combination: `{sample_combination(n, k, rng)}`")
+        st.markdown(f"* Random permutation: `{sample_permutation(n, k, rng)}`")
+        st.markdown(f"* Random distribution of {n} stars into {k} bins: `{sample_distribution(n, k, rng)}`")
+
+        # Item 0 lands in a uniform k-combination with probability k / n
+        batch = sample_combinations_batch(n, k, MONTE_CARLO_DRAWS, rng)
+        estimate = (batch == 0).any(axis=1).mean()
+        st.write(f"Monte Carlo check over {MONTE_CARLO_DRAWS:,} combinations: item 0 was chosen "
+                 f"**{estimate:.4f}** of the time; exact probability $k/n$ = **{k / n:.4f}**.")
+
+@st.fragment
+def display_more_counting_functions(n, k):
+    """Derangements, Stirling, Bell, partition and multiset counts for the current n and k."""
+    st.subheader("More Counting Functions")
+    col_d, col_s1, col_s2 = st.columns(3)
+    col_d.metric(label=f"Derangements D({n}):", value=format_big_int(derangements(n)))
+    col_s1.metric(label=f"Stirling 1st kind s({n}, {k}):", value=format_big_int(stirling_first(n, k)), help="Permutations of n items with exactly k cycles.")
+    col_s2.metric(label=f"Stirling 2nd kind S({n}, {k}):", value=format_big_int(stirling_second(n, k)), help="Ways to split n items into k non-empty groups.")
+    col_b, col_p, col_m = st.columns(3)
+    col_b.metric(label=f"Bell number B({n}):", value=format_big_int(bell_number(n)), help="Ways to split n items into any number of non-empty groups.")
+    col_p.metric(label=f"Integer partitions p({n}):", value=format_big_int(integer_partitions(n)))
+    with col_m:
+        word = st.text_input("Arrange the letters of:", value="BANANA")
+        letter_counts = Counter(word.replace(" ", "").upper())
+        st.metric(label=f"Distinct arrangements of {word.upper()}:", value=format_big_int(multiset_permutations(letter_counts.values())),
+                  help="n! divided by the factorial of each letter's repeat count.")
+
+def display_table_explorer():
+    """Displays whole tables of counts over ranges of n and k as a heatmap."""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_max = st.slider("Largest n:", min_value=1, max_value=1000, value=30)
+    with col2:
+        k_max = st.slider("Largest k:", min_value=1, max_value=1000, value=min(30, n_max))
+    with col3:
+        formula = st.selectbox("Formula:", TABLE_FORMULAS)
+
+    log_table, exact_table = counting_tables(n_max, k_max)[formula]
+    st.plotly_chart(draw_count_heatmap(formula, log_table, exact_table), use_container_width=True)
+
+    st.markdown("##### Look up a cell")
+    col_n, col_k = st.columns(2)
+    with col_n:
+        n = st.number_input("n", min_value=0, max_value=n_max, value=min(10, n_max))
+    with col_k:
+        k = st.number_input("k", min_value=0, max_value=k_max, value=min(5, k_max))
+    st.metric(label=f"{formula} at n = {n}, k = {k}:", value=format_count(log_table[n, k], exact_table[n, k]))
+
+def show_arrangement_page(kind, labels, k, key, n=None, page_size=10):
+    """Shows one page of arrangements, starting at a rank the user can type in."""
+    n = len(labels) if n is None else n
+    count = ARRANGEMENT_KINDS[kind][0](n, k)
+    with st.expander(f"See the arrangements ({count:,} in total)" if count < 10 ** 15 else "See the arrangements"):
+        if count == 0:
+            st.write("There are no arrangements for these values.")
+            return
+        start_text = st.text_input("Start at position (1-based):", value="1", key=f"{key}_start")
+        try:
+            start = int(start_text.replace(",", "")) - 1
+        except ValueError:
+            st.error("Please enter a whole number.")
+            return
+        start = max(0, min(start, count - 1))
+        rows = [
+            {"Position": f"{rank + 1:,}", "Arrangement": describe_arrangement(kind, arrangement, labels)}
+            for rank, arrangement in enumerate_arrangements(kind, n, k, start, start + page_size)
+        ]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
 
 def display_problem_solver():
     """Displays a section to solve one of the user's provided problems."""
@@ -122,6 +1301,7 @@ def display_problem_solver():
     
     st.latex(r"P(5, 3) = \frac{5!}{( 5 - 3 )!} = \frac{5!}{2!} = 5 \times 4 \times 3 = 60")
     st.metric(label="Final Answer:", value=f"{final_result}", help="Corresponds to answer B. 60 from your list.")
+    show_arrangement_page("Permutations", ["A", "B", "C", "D", "E"], 3, key="problem_18")
 
     st.subheader("Example: Problem 16 - Combinations")
     st.markdown("""
@@ -140,6 +1320,79 @@ def display_problem_solver():
     
     st.latex(r"C(5, 3) = \frac{5!}{3!( 5 - 3 )!} = \frac{5!}{3!2!} = \frac{5 \times 4}{2 \times 1} = 10")
     st.metric(label="Final Answer:", value=f"{final_result}", help="Corresponds to answer B. 10 from your list.")
+    show_arrangement_page("Combinations", ["Apple", "Banana", "Cherry", "Date", "Elderberry"], 3, key="problem_16")
+
+    st.subheader("Verify the Problem Bank")
+    st.write("Every answer is worked out from a formula and checked by listing all candidate arrangements and counting those that fit the problem.")
+    if st.button("Run Verification"):
+        workers = os.cpu_count() or 1
+        pool = get_verify_pool() if workers > 1 else None
+        with st.spinner(f"Counting candidates{f' across {workers} worker processes' if pool else ''}..."):
+            report = [verify_problem(spec, pool, workers) for spec in PROBLEM_BANK]
+        if all(row["Match"] for row in report):
+            st.success(f"All {len(report)} problems match their closed-form answers.")
+        else:
+            st.error("Some answers do not match the brute-force count.")
+        st.dataframe(report, use_container_width=True, hide_index=True)
+
+    st.subheader("Browse Any Arrangement")
+    st.write("Jump straight to any position in the list; earlier arrangements are never generated.")
+    col_kind, col_n, col_k = st.columns(3)
+    with col_kind:
+        kind = st.selectbox("Type:", list(ARRANGEMENT_KINDS))
+    with col_n:
+        n = st.number_input("Items / Stars (n):", min_value=0, max_value=1_000_000, value=10)
+    with col_k:
+        k = st.number_input("Chosen / Bins (k):", min_value=0, max_value=1000, value=4)
+    # Letters while they last, item numbers beyond that
+    labels = [chr(ord("A") + i) for i in range(n)] if n <= 26 else []
+    show_arrangement_page(kind, labels, k, key="browser", n=n)
+
+
+def display_probability_page():
+    """Displays hypergeometric and binomial probabilities built on the counting functions."""
+    st.sidebar.success("Viewing Probability")
+    st.header("4. From Counting to Probability")
+    st.write("Probability = (favourable arrangements) / (all arrangements). Both counts come from combinations.")
+
+    model = st.radio("Sampling:", ("Without replacement (Hypergeometric)", "With replacement (Binomial)"), horizontal=True)
+    if model.startswith("Without"):
+        st.markdown("**Example:** the chance of exactly 2 aces in a 5-card hand uses $N = 52$ cards, $K = 4$ aces, $n = 5$ drawn.")
+        st.latex(r"P(X = k) = \frac{\binom{K}{k}\binom{N - K}{n - k}}{\binom{N}{n}}")
+        col_pop, col_succ, col_draws = st.columns(3)
+        with col_pop:
+            population = st.number_input("Population size (N):", min_value=1, max_value=10 ** 9, value=52)
+        with col_succ:
+            successes = st.number_input("Successes in population (K):", min_value=0, max_value=population, value=min(4, population))
+        with col_draws:
+            draws = st.number_input("Items drawn (n):", min_value=0, max_value=min(population, 10 ** 6), value=min(5, population))
+        table = hypergeometric_distribution(population, successes, draws)
+        exact = (lambda k: hypergeometric_pmf_exact(population, successes, draws, k)) if population <= EXACT_PROBABILITY_MAX_N else None
+    else:
+        st.markdown("**Example:** the chance of exactly 2 sixes in 5 rolls of a die uses $n = 5$ and $p = 1/6$.")
+        st.latex(r"P(X = k) = \binom{n}{k} p^k (1 - p)^{n - k}")
+        col_trials, col_p = st.columns(2)
+        with col_trials:
+            trials = st.number_input("Trials (n):", min_value=0, max_value=10 ** 6, value=5)
+        with col_p:
+            p = st.number_input("Success probability (p):", min_value=0.0, max_value=1.0, value=round(1 / 6, 4), format="%.4f")
+        table = binomial_distribution(trials, p)
+        exact = (lambda k: binomial_pmf_exact(trials, p, k)) if trials <= EXACT_PROBABILITY_MAX_N else None
+
+    k_lo, k_hi = int(table["k"][0]), int(table["k"][-1])
+    k = st.number_input("Successes of interest (k):", min_value=k_lo, max_value=k_hi, value=min(max(2, k_lo), k_hi))
+    i = k - k_lo
+
+    col_eq, col_le, col_ge = st.columns(3)
+    col_eq.metric(label=f"P(X = {k})", value=f"{table['pmf'][i]:.6g}", help=f"log₁₀ = {table['log10_pmf'][i]:.4f}")
+    col_le.metric(label=f"P(X ≤ {k})", value=f"{table['cdf'][i]:.6g}")
+    col_ge.metric(label=f"P(X ≥ {k})", value=f"{table['at_least'][i]:.6g}")
+    if exact is not None:
+        exact_value = exact(k)
+        if exact_value.denominator.bit_length() < 200:
+            st.latex(r"P(X = %d) = \frac{%d}{%d}" % (k, exact_value.numerator, exact_value.denominator))
+
+    st.plotly_chart(draw_distribution_chart(table, k, "Probability of each number of successes"), use_container_width=True)
 
 
 # --- Main Application Logic ---
@@ -149,7 +1402,7 @@ def main():
     # Use radio buttons in the sidebar for navigation
     lesson_part = st.sidebar.radio(
         "Select Lesson Part:",
-        ("Core Concepts", "Interactive Calculator", "Problem Solver")
+        ("Core Concepts", "Interactive Calculator", "Problem Solver", "Probability")
     )
     
     if lesson_part == "Core Concepts":
@@ -158,6 +1411,8 @@ def main():
         display_calculator_page()
     elif lesson_part == "Problem Solver":
         display_problem_solver()
+    elif lesson_part == "Probability":
+        display_probability_page()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
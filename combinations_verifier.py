@@ -0,0 +1,44 @@
+"""Brute-force side of the problem verifier in combinations_permutation.py.
+
+Kept out of the Streamlit script so that spawned worker processes can import it: importing
+the script itself would run its whole page.
+"""
+import itertools
+
+
+def candidates(spec):
+    """Every candidate arrangement of the spec's items, straight from itertools."""
+    items, k = spec["items"], spec["choose"]
+    if spec["ordered"]:
+        return itertools.product(items, repeat=k) if spec["repetition"] else itertools.permutations(items, k)
+    return itertools.combinations_with_replacement(items, k) if spec["repetition"] else itertools.combinations(items, k)
+
+
+def satisfies(arrangement, constraints):
+    for name, values in constraints:
+        if name == "starts_with" and not (arrangement and arrangement[0] in values):
+            return False
+        if name == "ends_with" and not (arrangement and arrangement[-1] in values):
+            return False
+        if name == "includes" and not all(v in arrangement for v in values):
+            return False
+        if name == "excludes" and any(v in arrangement for v in values):
+            return False
+        if name == "not_adjacent":
+            a, b = values
+            if any({x, y} == {a, b} for x, y in zip(arrangement, arrangement[1:])):
+                return False
+    return True
+
+
+def count_chunk(task):
+    """Worker: lists candidates [start, stop) of a spec (stop None = to the end) and counts those
+    meeting its constraints. Returns (candidates listed, matches)."""
+    spec, start, stop = task
+    constraints = spec.get("constraints", [])
+    listed = found = 0
+    # The skipped candidates are produced in C by itertools, far faster than they are checked
+    for arrangement in itertools.islice(candidates(spec), start, stop):
+        listed += 1
+        found += satisfies(arrangement, constraints)
+    return listed, found
@@ -1,6 +1,18 @@
+import os
+import time
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+from contextlib import closing
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
+from join_workers import join_partition, share_array
+from spawn_pool import start_pool
 
 st.set_page_config(page_title="SQL Join Visualizer", layout="wide")
 
@@ -31,32 +43,46 @@ COLOR_LEFT_ONLY = '#ffc0cb'  # Light Pink/Coral - Exclusive to A
 COLOR_RIGHT_ONLY = '#add8e6' # Light Blue/Sky Blue - Exclusive to B
 COLOR_BOTH = '#90ee90'       # Light Green/Pale Green - Intersection
 
+# Row CSS in `_merge` category order: left_only, right_only, both
+ROW_CSS = np.array([f'background-color: {color}' for color in (COLOR_LEFT_ONLY, COLOR_RIGHT_ONLY, COLOR_BOTH)], dtype=object)
+PAGE_SIZES = [25, 50, 100, 500]  # Result rows sent to the browser per page
+
 # =======================
 # FUNCTIONS
 # =======================
-def do_join(join_type, key_A, key_B):
+def do_join(join_type, key_A, key_B, engine="pandas merge"):
     """Performs the merge operation using the user-selected join keys."""
     # Use left_on and right_on to join on specific columns, instead of the index
-    return A.merge(B, left_on=key_A, right_on=key_B, how=join_type.lower(), indicator=True)
+    return JOIN_ENGINES[engine](A, B, join_type, key_A, key_B)
+
+def highlight_rows(table):
+    """Highlights rows based on the join result type using high-contrast colours.
 
-def highlight_rows(row):
-    """Highlights rows based on the join result type using high-contrast colours."""
-    if row['_merge'] == "left_only":
-        return [f'background-color: {COLOR_LEFT_ONLY}'] * len(row)
-    elif row['_merge'] == "right_only":
-        return [f'background-color: {COLOR_RIGHT_ONLY}'] * len(row)
-    else: # 'both'
-        return [f'background-color: {COLOR_BOTH}'] * len(row)
+    Styles a whole frame in one step: the `_merge` category codes index ROW_CSS,
+    so no Python code runs per row.
+    """
+    row_css = ROW_CSS[table['_merge'].cat.codes.to_numpy()]
+    return pd.DataFrame(np.repeat(row_css[:, None], table.shape[1], axis=1), index=table.index, columns=table.columns)
+
+def key_label(keys):
+    """A join key for display: the column name, or the column names in brackets for a composite key."""
+    return keys[0] if len(keys) == 1 else "({})".format(", ".join(keys))
 
 def get_join_explanation(join_type, key_A, key_B):
     """Provides the educational explanation for the selected join."""
     base_notes = {
-        "INNER": "Returns records where the value in Table A's **{}** matches the value in Table B's **{}**.".format(key_A, key_B),
+        "INNER": "Returns records where the value in Table A's **{}** matches the value in Table B's **{}**.".format(key_label(key_A), key_label(key_B)),
         "LEFT": "Returns **all** records from the **LEFT** table (A) and matched records from B. Unmatched fields from B show **NaN**.",
         "RIGHT": "Returns **all** records from the **RIGHT** table (B) and matched records from A. Unmatched fields from A show **NaN**.",
         "OUTER": "Returns **all** records when there is a match in either table. Unmatched fields from both tables show **NaN**.",
+        "LEFT SEMI": "Returns each record of A that has **at least one** match in B, once, with only A's columns. B's keys are hashed into a set and every A row is looked up in it, so no joined rows are built.",
+        "LEFT ANTI": "Returns each record of A that has **no** match in B, with only A's columns (like `WHERE NOT EXISTS`). It uses the same hashed lookup as the semi join.",
+        "CROSS": "Pairs **every** record of A with **every** record of B, so the result has rows(A) × rows(B) rows. No key columns are used.",
     }
-    return base_notes.get(join_type, "")
+    note = base_notes.get(join_type, "")
+    if len(key_A) > 1:
+        note += " With a composite key, records match only when **every** key column matches."
+    return note
 
 def draw_venn(join_type, left_only, both, right_only):
     """Draws a simplified Venn diagram and shades the region based on the join type."""
@@ -89,6 +115,15 @@ def draw_venn(join_type, left_only, both, right_only):
             dict(x0=1, y0=0, x1=2, y1=2, color=COLOR_BOTH),
             dict(x0=2, y0=0, x1=3, y1=2, color=COLOR_RIGHT_ONLY)
         ]
+    elif join_type == "LEFT SEMI":
+        # Shade only the intersection; each matched A row appears once, with A's columns
+        shades = [dict(x0=1, y0=0, x1=2, y1=2, color=COLOR_BOTH)]
+    elif join_type == "LEFT ANTI":
+        # Shade only Left Exclusive (x=0 to x=1)
+        shades = [dict(x0=0, y0=0, x1=1, y1=2, color=COLOR_LEFT_ONLY)]
+    elif join_type == "CROSS":
+        # Every row of A meets every row of B, so both circles are shaded whole
+        shades = [dict(x0=0, y0=0, x1=3, y1=2, color=COLOR_BOTH)]
     else:
         shades = []
 
@@ -101,7 +136,7 @@ def draw_venn(join_type, left_only, both, right_only):
     # 3. Add Counts and Labels
     # Plotly text coordinates are centered, so we adjust x slightly
     fig.add_trace(go.Scatter(x=[0.5], y=[1], text=[f"A Only<br>({left_only})"], mode="text", textfont=dict(size=14, color='black')))
-    fig.add_trace(go.Scatter(x=[1.5], y=[1], text=[f"Both<br>({both})"], mode="text", textfont=dict(size=14, color='black')))
+    fig.add_trace(go.Scatter(x=[1.5], y=[1], text=[f"{'A × B' if join_type == 'CROSS' else 'Both'}<br>({both})"], mode="text", textfont=dict(size=14, color='black')))
     fig.add_trace(go.Scatter(x=[2.5], y=[1], text=[f"B Only<br>({right_only})"], mode="text", textfont=dict(size=14, color='black')))
 
     fig.update_xaxes(visible=False, range=[-0.5, 3.5])
@@ -110,45 +145,1320 @@ def draw_venn(join_type, left_only, both, right_only):
 
     return fig
 
+# =======================
+# JOIN ENGINE
+# =======================
+MERGE_CATEGORIES = ["left_only", "right_only", "both"]
+JOIN_TYPES = ["INNER", "LEFT", "RIGHT", "OUTER", "LEFT SEMI", "LEFT ANTI", "CROSS"]
+SEMI_JOINS = ("left semi", "left anti")  # Return rows of A only, each at most once
+ANIMATION_MAX_ROWS = 12      # Build/probe animation only replays small tables
+BENCHMARK_ROWS = 200_000     # Table A is tiled to this many rows for the rows/sec comparison
+
+def _check_key_dtypes(left_keys, right_keys):
+    """Rejects number-vs-text key pairs, which pandas merge refuses as well. A key without a single value
+    matches any dtype: a blank CSV column, or a blank stretch of one read as a chunk, comes out as float64."""
+    if left_keys.isna().all() or right_keys.isna().all():
+        return
+    if pd.api.types.is_numeric_dtype(left_keys) != pd.api.types.is_numeric_dtype(right_keys):
+        raise ValueError(f"You are trying to merge on {left_keys.dtype} and {right_keys.dtype} columns.")
+
+def join_key_names(join_type, key_A, key_B):
+    """Key columns a join uses: none for a CROSS JOIN, otherwise the same number (at least one) on each side."""
+    if join_type == "CROSS":
+        return [], []
+    if not key_A or len(key_A) != len(key_B):
+        raise ValueError("Choose the same number of key columns (at least one) for both tables.")
+    return list(key_A), list(key_B)
+
+def _check_key_columns(left, right, key_A, key_B):
+    for column_A, column_B in zip(key_A, key_B):
+        _check_key_dtypes(left[column_A], right[column_B])
+
+def _key_pair(left_column, right_column):
+    """Two key columns with one shared dictionary (see `encode_tables`) are replaced by their integer
+    codes. Codes follow the sorted dictionary with NaN as -1, so they order rows as pandas orders the
+    categoricals themselves."""
+    if isinstance(left_column.dtype, pd.CategoricalDtype) and left_column.dtype == right_column.dtype:
+        return pd.Series(left_column.cat.codes.to_numpy()), pd.Series(right_column.cat.codes.to_numpy())
+    return left_column.reset_index(drop=True), right_column.reset_index(drop=True)
+
+def join_keys(left, right, key_A, key_B):
+    """One key Series per table for the join engines.
+
+    A single key column is used as it is, or as its codes when both sides share a dictionary. A composite key becomes one integer code per row, numbered
+    in sorted key order so that outer joins still come out sorted. With no key columns (CROSS JOIN)
+    every row gets the same code, which matches every row of A with every row of B.
+    """
+    _check_key_columns(left, right, key_A, key_B)
+    if len(key_A) == 1:
+        return _key_pair(left[key_A[0]], right[key_B[0]])
+    codes = np.zeros(len(left) + len(right), dtype=np.int64)
+    for column_A, column_B in zip(key_A, key_B):
+        column_codes, uniques = pd.factorize(pd.concat(_key_pair(left[column_A], right[column_B]), ignore_index=True),
+                                             sort=True, use_na_sentinel=False)
+        codes, _ = pd.factorize(codes * len(uniques) + column_codes, sort=True)
+    return pd.Series(codes[:len(left)]), pd.Series(codes[len(left):])
+
+def key_membership(left_keys, right_keys):
+    """Hashed membership for SEMI/ANTI joins: B's keys go into a hash set and each key of A is looked
+    up once, so no (A row, B row) pairs are built however often the keys repeat."""
+    return left_keys.isin(right_keys).to_numpy()
+
+def _expand_matches(outer_rows, starts, counts, inner_order):
+    """Turns per-row bucket ranges into one (outer row, inner row) pair per match."""
+    total = int(counts.sum())
+    outer_pairs = np.repeat(outer_rows, counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    inner_pairs = inner_order[np.repeat(starts, counts) + offsets]
+    return outer_pairs, inner_pairs
+
+def build_hash_table(build_keys):
+    """Build phase: hashes each key to a bucket and groups the build rows by bucket."""
+    build_codes, uniques = pd.factorize(build_keys, use_na_sentinel=False)
+    bucket_rows = np.argsort(build_codes, kind="stable")
+    bucket_sizes = np.bincount(build_codes, minlength=len(uniques))
+    bucket_starts = np.cumsum(bucket_sizes) - bucket_sizes
+    return pd.Index(uniques), bucket_rows, bucket_starts, bucket_sizes
+
+def probe_hash_table(hash_table, probe_keys):
+    """Probe phase: looks up each probe key's bucket and returns (probe row, build row) match pairs."""
+    bucket_index, bucket_rows, bucket_starts, bucket_sizes = hash_table
+    probe_codes = bucket_index.get_indexer(probe_keys)  # -1 = no bucket
+    hit = probe_codes >= 0
+    return _expand_matches(np.flatnonzero(hit), bucket_starts[probe_codes[hit]],
+                           bucket_sizes[probe_codes[hit]], bucket_rows)
+
+def hash_join_pairs(left_keys, right_keys):
+    """Hash join: builds buckets on the smaller side, then probes them with every row of the larger side."""
+    swap = len(left_keys) < len(right_keys)
+    build, probe = (left_keys, right_keys) if swap else (right_keys, left_keys)
+    probe_pairs, build_pairs = probe_hash_table(build_hash_table(build), probe)
+    return (build_pairs, probe_pairs) if swap else (probe_pairs, build_pairs)
+
+def sort_merge_join_pairs(left_keys, right_keys):
+    """Sort-merge join: sorts both sides by key, then walks them together to find equal-key runs."""
+    codes, _ = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True), sort=True, use_na_sentinel=False)
+    left_codes, right_codes = codes[:len(left_keys)], codes[len(left_keys):]
+    left_order = np.argsort(left_codes, kind="stable")
+    right_order = np.argsort(right_codes, kind="stable")
+    right_sorted = right_codes[right_order]
+
+    # Each sorted left key matches one contiguous run of sorted right keys
+    left_sorted = left_codes[left_order]
+    run_starts = np.searchsorted(right_sorted, left_sorted, side="left")
+    run_ends = np.searchsorted(right_sorted, left_sorted, side="right")
+    return _expand_matches(left_order, run_starts, run_ends - run_starts, right_order)
+
+def _pairs_for_join(left_pairs, right_pairs, left_keys, right_keys, how):
+    """Adds unmatched rows (-1 on the missing side) and orders the pairs: INNER and LEFT joins in A's row
+    order, RIGHT joins in B's and OUTER joins by key. pandas merge returns the same rows, though its INNER
+    order can differ (it does not always keep A's order)."""
+    n_left, n_right = len(left_keys), len(right_keys)
+    if how in ("left", "outer"):
+        unmatched = np.flatnonzero(np.bincount(left_pairs, minlength=n_left) == 0)
+        left_pairs = np.concatenate([left_pairs, unmatched])
+        right_pairs = np.concatenate([right_pairs, np.full(len(unmatched), -1)])
+    if how in ("right", "outer"):
+        unmatched = np.flatnonzero(np.bincount(right_pairs[right_pairs >= 0], minlength=n_right) == 0)
+        left_pairs = np.concatenate([left_pairs, np.full(len(unmatched), -1)])
+        right_pairs = np.concatenate([right_pairs, unmatched])
+
+    # Preserve the order of the driving table. Both pair finders emit each row's matches in
+    # ascending order, so a stable sort on the driving row is enough and merges presorted runs cheaply.
+    if how == "right":
+        order = np.argsort(right_pairs, kind="stable")
+    elif how == "outer":
+        # Outer joins come out sorted by key, as in pandas
+        codes, _ = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True), sort=True, use_na_sentinel=False)
+        matched_left = left_pairs >= 0
+        key_rank = np.empty(len(left_pairs), dtype=codes.dtype)
+        key_rank[matched_left] = codes[left_pairs[matched_left]]
+        key_rank[~matched_left] = codes[n_left + right_pairs[~matched_left]]
+        order = np.lexsort((right_pairs, left_pairs, key_rank))
+    else:
+        order = np.argsort(left_pairs, kind="stable")
+    return left_pairs[order], right_pairs[order]
+
+def _take_rows(table, rows):
+    """Gathers rows by position; -1 becomes an all-NaN row, as for unmatched rows in an outer join."""
+    table = table.reset_index(drop=True)
+    picked = table.take(rows) if (rows >= 0).all() else table.reindex(rows)
+    return picked.reset_index(drop=True)
+
+def assemble_join(left, right, left_pairs, right_pairs, key_A, key_B):
+    """Builds the joined frame from row pairs with the same columns and `_merge` indicator as pandas merge."""
+    left_part = _take_rows(left, left_pairs)
+    right_part = _take_rows(right, right_pairs)
+
+    for column_A, column_B in zip(key_A, key_B):
+        if column_A != column_B:
+            continue
+        # A shared key name becomes one column, filled from whichever side matched
+        key = left_part[column_A].where(left_pairs >= 0, right_part[column_B])
+        if not key.isna().any() and left[column_A].dtype == right[column_B].dtype:
+            key = key.astype(left[column_A].dtype)
+        left_part[column_A] = key
+        right_part = right_part.drop(columns=column_B)
+
+    overlap = set(left_part.columns) & set(right_part.columns)
+    left_part = left_part.rename(columns={c: f"{c}_x" for c in overlap})
+    right_part = right_part.rename(columns={c: f"{c}_y" for c in overlap})
+
+    # Codes index MERGE_CATEGORIES: 0 = left_only, 1 = right_only, 2 = both
+    merge_codes = np.where(left_pairs < 0, 1, np.where(right_pairs < 0, 0, 2))
+    result = pd.concat([left_part, right_part], axis=1)
+    result["_merge"] = pd.Categorical.from_codes(merge_codes, categories=MERGE_CATEGORIES)
+    return result
+
+def assemble_semi_join(left, matched, anti):
+    """SEMI/ANTI result: the matched (or, for ANTI, unmatched) rows of A with A's columns and a `_merge` column."""
+    result = left[~matched if anti else matched].reset_index(drop=True)
+    result["_merge"] = pd.Categorical.from_codes(np.full(len(result), 0 if anti else 2), categories=MERGE_CATEGORIES)
+    return result
+
+def engine_join(left, right, join_type, key_A, key_B, pair_finder):
+    """Runs a join through one of the engine's pair finders."""
+    how = join_type.lower()
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    left_keys, right_keys = join_keys(left, right, key_A, key_B)
+    if how in SEMI_JOINS:
+        return assemble_semi_join(left, key_membership(left_keys, right_keys), how == "left anti")
+    left_pairs, right_pairs = pair_finder(left_keys, right_keys)
+    # A CROSS JOIN is an inner join on a key that every row shares
+    left_pairs, right_pairs = _pairs_for_join(left_pairs, right_pairs, left_keys, right_keys, "inner" if how == "cross" else how)
+    return assemble_join(left, right, left_pairs, right_pairs, key_A, key_B)
+
+def pandas_join(left, right, join_type, key_A, key_B):
+    """Reference join: pandas merge. pandas has no SEMI/ANTI merge, so those use hashed membership."""
+    how = join_type.lower()
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    if how in SEMI_JOINS:
+        return assemble_semi_join(left, key_membership(*join_keys(left, right, key_A, key_B)), how == "left anti")
+    if how == "cross":
+        return left.merge(right, how="cross", indicator=True)
+    # merge refuses text against float64 even when the float column is all NaN, so such a key takes the other side's dtype
+    for column_A, column_B in zip(key_A, key_B):
+        if left[column_A].isna().all() and not right[column_B].isna().all():
+            left = left.assign(**{column_A: pd.Series(np.nan, index=left.index).astype(right[column_B].dtype)})
+        elif right[column_B].isna().all() and not left[column_A].isna().all():
+            right = right.assign(**{column_B: pd.Series(np.nan, index=right.index).astype(left[column_A].dtype)})
+    return left.merge(right, left_on=key_A, right_on=key_B, how=how, indicator=True)
+
+JOIN_ENGINES = {
+    "pandas merge": pandas_join,
+    "Hash join": lambda left, right, join_type, key_A, key_B: engine_join(left, right, join_type, key_A, key_B, hash_join_pairs),
+    "Sort-merge join": lambda left, right, join_type, key_A, key_B: engine_join(left, right, join_type, key_A, key_B, sort_merge_join_pairs),
+}
+
+def _animation_keys(table, keys):
+    """Keys of the rows the animation replays: values, or tuples of values for a composite key."""
+    rows = table[keys].iloc[:ANIMATION_MAX_ROWS]
+    return rows[keys[0]].tolist() if len(keys) == 1 else list(rows.itertuples(index=False, name=None))
+
+def hash_join_steps(left, right, key_A, key_B):
+    """Replays a hash join one row at a time: every build insert and every probe lookup is one step."""
+    swap = len(left) < len(right)
+    build, build_key, build_name = (left, key_A, "A") if swap else (right, key_B, "B")
+    probe, probe_key, probe_name = (right, key_B, "B") if swap else (left, key_A, "A")
+
+    steps, buckets = [], {}
+    for row, value in enumerate(_animation_keys(build, build_key)):
+        buckets.setdefault(value, []).append(row)
+        steps.append(dict(phase="Build", table=build_name, row=row, key=value,
+                          note=f"Insert {build_name} row {row} into bucket `{value}`",
+                          buckets={k: list(v) for k, v in buckets.items()}, matches=[]))
+    for row, value in enumerate(_animation_keys(probe, probe_key)):
+        matches = buckets.get(value, [])
+        note = (f"Probe {probe_name} row {row} (`{value}`): matches {build_name} rows {matches}" if matches
+                else f"Probe {probe_name} row {row} (`{value}`): no bucket, no match")
+        steps.append(dict(phase="Probe", table=probe_name, row=row, key=value, note=note,
+                          buckets=steps[-1]["buckets"] if steps else {}, matches=matches))
+    return steps
+
+def draw_hash_table(step):
+    """Draws the hash table buckets for one animation step, highlighting the bucket in use."""
+    keys = list(step["buckets"].keys())
+    sizes = [len(step["buckets"][k]) for k in keys]
+    active = COLOR_BOTH if step["phase"] == "Probe" and step["matches"] else COLOR_LEFT_ONLY if step["phase"] == "Probe" else COLOR_RIGHT_ONLY
+    colors = [active if k == step["key"] else "lightgray" for k in keys]
+    fig = go.Figure(go.Bar(x=[str(k) for k in keys], y=sizes, marker_color=colors,
+                           text=[", ".join(map(str, step["buckets"][k])) for k in keys], textposition="inside"))
+    fig.update_layout(height=300, template="plotly_white", margin=dict(l=20, r=20, t=40, b=20),
+                      title=f"{step['phase']} phase", xaxis_title="Bucket (key value)", yaxis_title="Rows in bucket")
+    return fig
+
+def benchmark_table(join_type, rows=BENCHMARK_ROWS):
+    """Table A tiled to about `rows` rows for the timing runs."""
+    if join_type == "CROSS":
+        # Keep the cross product, not Table A, near `rows` rows
+        rows = max(len(A), rows // max(1, len(B)))
+    return pd.concat([A] * max(1, rows // len(A)), ignore_index=True)
+
+def benchmark_join_engines(join_type, key_A, key_B, rows=BENCHMARK_ROWS):
+    """Times every engine on Table A tiled to `rows` rows, reported as input rows per second."""
+    left = benchmark_table(join_type, rows)
+    records = []
+    for name, engine in JOIN_ENGINES.items():
+        start = time.perf_counter()
+        output = engine(left, B, join_type, key_A, key_B)
+        elapsed = time.perf_counter() - start
+        records.append({"Engine": name, "Output rows": len(output), "Seconds": round(elapsed, 4),
+                        "Rows/sec": int((len(left) + len(B)) / elapsed)})
+    return pd.DataFrame(records)
+
+# =======================
+# KEY STATISTICS
+# =======================
+DEFAULT_ROW_BUDGET = 2_000_000   # Joins estimated above this many rows are refused...
+DEFAULT_MEMORY_BUDGET_MB = 1024  # ...as are joins estimated above this much result memory
+BUDGET_WARN_FRACTION = 0.5       # Warn once an estimate passes this share of a budget
+SKETCH_WIDTH = 4096              # Count sketch buckets per sketch row
+HLL_PRECISION = 12               # 2^12 HyperLogLog registers, about 1.6% error on distinct keys
+# One odd 64-bit multiplier per sketch row, so each row buckets the keys differently
+SKETCH_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93], dtype=np.uint64)
+
+def key_multiplicities(left_keys, right_keys):
+    """How many rows of A and of B carry each distinct key value (NaN keys match each other, as in pandas)."""
+    codes, uniques = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True), use_na_sentinel=False)
+    left_counts = np.bincount(codes[:len(left_keys)], minlength=len(uniques))
+    right_counts = np.bincount(codes[len(left_keys):], minlength=len(uniques))
+    return left_counts, right_counts
+
+def _venn_from_multiplicities(how, left_counts, right_counts):
+    if how in SEMI_JOINS:
+        # Each row of A appears at most once, however many rows of B it matches
+        matched = int(left_counts[right_counts > 0].sum())
+        return (0, matched, 0) if how == "left semi" else (int(left_counts.sum()) - matched, 0, 0)
+    both = int(np.dot(left_counts, right_counts))
+    left_only = int(left_counts[right_counts == 0].sum()) if how in ("left", "outer") else 0
+    right_only = int(right_counts[left_counts == 0].sum()) if how in ("right", "outer") else 0
+    return left_only, both, right_only
+
+def venn_counts(join_type, left_keys, right_keys):
+    """Result rows in each Venn region (left only, both, right only), from key multiplicities alone.
+
+    A key that appears a times in A and b times in B contributes a * b matched rows, so
+    many-to-many keys are counted exactly without building a single result row.
+    """
+    _check_key_dtypes(left_keys, right_keys)
+    return _venn_from_multiplicities(join_type.lower(), *key_multiplicities(left_keys, right_keys))
+
+MISSING_KEY_HASH = pd.util.hash_array(np.array([np.nan]))[0]  # Every missing key hashes alike, whatever its column's dtype
+
+def key_hashes(keys):
+    """64-bit hashes of key values, equal for equal keys whatever their dtype. Whole numbers are hashed as int64,
+    so 10 in one file matches 10.0 in another while 2**53 + 1 stays apart from 2**53; other numbers as floats."""
+    missing = keys.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(keys) or not pd.api.types.is_numeric_dtype(keys):
+        hashes = pd.util.hash_array(keys.to_numpy(dtype=object))
+    else:
+        numbers = keys.to_numpy(dtype="float64", na_value=np.nan)
+        hashes = pd.util.hash_array(numbers)
+        if pd.api.types.is_integer_dtype(keys):
+            whole = ~missing
+            integers = keys.to_numpy(dtype="int64", na_value=0)
+        else:
+            whole = ~missing & np.isfinite(numbers) & (numbers == np.floor(numbers)) & (np.abs(numbers) < 2.0 ** 63)
+            integers = np.where(whole, numbers, 0).astype("int64")
+        hashes[whole] = pd.util.hash_array(integers[whole])
+    hashes[missing] = MISSING_KEY_HASH
+    return hashes
+
+def key_values(table, keys):
+    """A table's join key without looking at the other table, for files read chunk by chunk: the key
+    column, one 64-bit hash of all the key columns for a composite key, or a constant for a CROSS JOIN.
+    Equal key values get equal keys in every chunk of either file."""
+    if len(keys) == 1:
+        return table[keys[0]]
+    hashes = np.zeros(len(table), dtype=np.uint64)
+    for key in keys:
+        hashes = hashes * np.uint64(0x100000001B3) ^ key_hashes(table[key])
+    return pd.Series(hashes, index=table.index)
+
+class KeySketch:
+    """Fixed-size summary of a key column: a count sketch (Count-Min with a random +1/-1 sign
+    per key) of key frequencies, and HyperLogLog registers for the number of distinct keys.
+
+    Sketches merge exactly across chunks, so a file is sketched one chunk at a time.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.counts = np.zeros((len(SKETCH_MULTIPLIERS), SKETCH_WIDTH), dtype=np.int64)
+        self.registers = np.zeros(1 << HLL_PRECISION, dtype=np.uint8)
+
+    def add(self, keys):
+        hashes = key_hashes(keys)
+        self.rows += len(hashes)
+        for row, multiplier in enumerate(SKETCH_MULTIPLIERS):
+            mixed = hashes * multiplier
+            buckets = ((mixed >> np.uint64(32)) % np.uint64(SKETCH_WIDTH)).astype(np.intp)
+            signs = 1.0 - 2.0 * ((mixed >> np.uint64(31)) & np.uint64(1))
+            self.counts[row] += np.bincount(buckets, weights=signs, minlength=SKETCH_WIDTH).astype(np.int64)
+
+        # The top bits pick a register, which keeps the longest run of leading zeros seen in the remaining bits
+        register = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.intp)
+        _, bit_length = np.frexp((hashes << np.uint64(HLL_PRECISION)).astype(np.float64))
+        rank = np.clip(65 - bit_length, 1, 65 - HLL_PRECISION).astype(np.uint8)
+        np.maximum.at(self.registers, register, rank)
+        return self
+
+    @staticmethod
+    def _distinct(registers):
+        m = len(registers)
+        raw = 0.7213 / (1 + 1.079 / m) * m * m / np.ldexp(1.0, -registers.astype(int)).sum()
+        empty = np.count_nonzero(registers == 0)
+        # Small sets are estimated more accurately from the share of empty registers
+        return int(round(m * np.log(m / empty))) if raw <= 2.5 * m and empty else int(round(raw))
+
+    def distinct(self):
+        return self._distinct(self.registers)
+
+    def distinct_union(self, other):
+        # The union of two HyperLogLogs is their register-wise maximum
+        return self._distinct(np.maximum(self.registers, other.registers))
+
+def sketch_estimate(join_type, left_sketch, right_sketch):
+    """Join cardinality from two KeySketches.
+
+    Matched rows: each sketch row's signed inner product is an unbiased estimate of the
+    sum of a * b over keys, and the median row is used. Unmatched rows: shared distinct
+    keys come from HyperLogLog inclusion-exclusion, assuming keys repeat evenly.
+    """
+    how = join_type.lower()
+    both = max(0, int(np.median((left_sketch.counts * right_sketch.counts).sum(axis=1))))
+    left_distinct, right_distinct = left_sketch.distinct(), right_sketch.distinct()
+    shared = max(0, left_distinct + right_distinct - left_sketch.distinct_union(right_sketch))
+    left_matched = round(left_sketch.rows * min(1, shared / left_distinct)) if left_distinct else 0
+    right_matched = round(right_sketch.rows * min(1, shared / right_distinct)) if right_distinct else 0
+    if how in SEMI_JOINS:
+        counts = (0, left_matched, 0) if how == "left semi" else (left_sketch.rows - left_matched, 0, 0)
+    else:
+        counts = (left_sketch.rows - left_matched if how in ("left", "outer") else 0, both,
+                  right_sketch.rows - right_matched if how in ("right", "outer") else 0)
+    return {
+        "counts": counts,
+        "rows": (left_sketch.rows, right_sketch.rows),
+        "distinct": (left_distinct, right_distinct),
+    }
+
+def exact_estimate(join_type, left_keys, right_keys):
+    """Join cardinality from exact key histograms."""
+    left_counts, right_counts = key_multiplicities(left_keys, right_keys)
+    return {
+        "counts": _venn_from_multiplicities(join_type.lower(), left_counts, right_counts),
+        "rows": (len(left_keys), len(right_keys)),
+        "distinct": (int(np.count_nonzero(left_counts)), int(np.count_nonzero(right_counts))),
+    }
+
+ESTIMATORS = ["Exact (key histograms)", "Sketch (count sketch + HyperLogLog)"]
+
+def estimate_join(join_type, left_keys, right_keys, estimator):
+    """Estimates the result size of joining two in-memory key columns."""
+    _check_key_dtypes(left_keys, right_keys)
+    if estimator == ESTIMATORS[0]:
+        return exact_estimate(join_type, left_keys, right_keys)
+    return sketch_estimate(join_type, KeySketch().add(left_keys), KeySketch().add(right_keys))
+
+def table_row_bytes(table):
+    """Average in-memory bytes per row, strings included."""
+    return table.memory_usage(deep=True, index=False).sum() / max(1, len(table))
+
+def budget_verdict(rows, memory_bytes, row_budget, memory_budget_mb):
+    """'refuse' when an estimate exceeds a budget, 'warn' past BUDGET_WARN_FRACTION of one, otherwise 'ok'."""
+    share = max(rows / row_budget, memory_bytes / (memory_budget_mb * 2 ** 20))
+    return "refuse" if share > 1 else "warn" if share > BUDGET_WARN_FRACTION else "ok"
+
+# =======================
+# FILE SOURCES & STREAMING
+# =======================
+STREAM_CHUNK_ROWS = 250_000  # Rows of the larger file held in memory at a time
+PREVIEW_ROWS = 100           # Default number of result rows shown while a stream runs
+
+def _is_parquet(source):
+    """File sources are an uploaded file or a path; the extension picks the reader."""
+    name = getattr(source, "name", str(source)).lower()
+    return name.endswith((".parquet", ".pq"))
+
+def _rewind(source):
+    """Uploaded files are read several times (preview, build, chunks), so start each read at byte 0."""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+def source_size(source):
+    """Size in bytes, used to decide which file is hashed and which is streamed."""
+    return source.size if hasattr(source, "size") else os.path.getsize(source)
+
+def read_table(source):
+    """Reads a whole CSV or Parquet file."""
+    return pd.read_parquet(_rewind(source)) if _is_parquet(source) else pd.read_csv(_rewind(source))
+
+def peek_table(source, rows=PREVIEW_ROWS):
+    """Reads only the first rows of a file, for column names and the table previews."""
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        batch = next(pq.ParquetFile(_rewind(source)).iter_batches(batch_size=max(1, rows)), None)
+        return batch.to_pandas() if batch is not None else pq.read_schema(_rewind(source)).empty_table().to_pandas()
+    return pd.read_csv(_rewind(source), nrows=rows)
+
+def _key_columns_to_read(source, keys):
+    """A CROSS JOIN has no key columns, so the first column is read to count the rows."""
+    return list(keys) or list(peek_table(source, 0).columns[:1])
+
+def read_key_columns(source, keys):
+    """Reads only the key columns of a file; key statistics need nothing else."""
+    if _is_parquet(source):
+        return pd.read_parquet(_rewind(source), columns=_key_columns_to_read(source, keys))
+    return pd.read_csv(_rewind(source), usecols=_key_columns_to_read(source, keys))
+
+def iter_table_chunks(source, chunk_rows=STREAM_CHUNK_ROWS, columns=None):
+    """Yields a file as DataFrames of at most `chunk_rows` rows, optionally reading only `columns`."""
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(_rewind(source)).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(_rewind(source), chunksize=chunk_rows, usecols=columns)
+
+def _note_key_values(found, chunk, keys):
+    """Keeps the first value of each key column met while streaming. read_csv types each chunk on its
+    own, so the file's first rows may hold no key values and say nothing about the column's dtype."""
+    for key in keys:
+        if key not in found and chunk[key].notna().any():
+            found[key] = chunk[key].dropna().iloc[:1].reset_index(drop=True)
+
+def _key_sample(found, keys):
+    """One row of key values to type-check against; a column with no values at all is NaN and matches anything."""
+    return pd.DataFrame({key: found.get(key, pd.Series([np.nan])) for key in keys})
+
+def estimate_file_join(join_type, source_A, source_B, key_A, key_B, estimator):
+    """Estimates the result size of joining two files. The sketch estimator streams the key
+    columns chunk by chunk, so its memory does not grow with the files."""
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    if estimator == ESTIMATORS[0]:
+        keys = join_keys(read_key_columns(source_A, key_A), read_key_columns(source_B, key_B), key_A, key_B)
+        return estimate_join(join_type, *keys, estimator)
+    sketches, samples = [], []
+    for source, keys in ((source_A, key_A), (source_B, key_B)):
+        sketch, found = KeySketch(), {}
+        for chunk in iter_table_chunks(source, columns=_key_columns_to_read(source, keys)):
+            sketch.add(key_values(chunk, keys))
+            _note_key_values(found, chunk, keys)
+        sketches.append(sketch)
+        samples.append(_key_sample(found, keys))
+    _check_key_columns(*samples, key_A, key_B)
+    return sketch_estimate(join_type, *sketches)
+
+def stream_join(source_A, source_B, join_type, key_A, key_B, chunk_rows=STREAM_CHUNK_ROWS):
+    """Streaming hash join over two files. The smaller file is hashed in memory and the larger one is
+    read chunk by chunk, so memory holds the hash table plus one chunk. Yields each chunk's result rows;
+    rows come out in file order rather than pandas' order."""
+    how = join_type.lower()
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    if how in SEMI_JOINS:
+        yield from stream_semi_join(source_A, source_B, join_type, key_A, key_B, chunk_rows)
+        return
+    build_is_left = source_size(source_A) <= source_size(source_B)
+    build_source, build_key, probe_source, probe_key = (
+        (source_A, key_A, source_B, key_B) if build_is_left else (source_B, key_B, source_A, key_A))
+    keep_build = how in ("outer", "left" if build_is_left else "right")
+    keep_probe = how in ("outer", "right" if build_is_left else "left")
+
+    build = read_table(build_source)
+    hash_table = build_hash_table(key_values(build, build_key))
+    build_matched = np.zeros(len(build), dtype=bool)
+    # No rows, but the probe file's dtypes, so unmatched build rows come out with the same columns as the rest
+    probe_columns = peek_table(probe_source).iloc[:0]
+    if how == "cross":
+        # Every probe row meets every build row, so read fewer probe rows to keep result chunks near chunk_rows
+        chunk_rows = max(1, chunk_rows // max(1, len(build)))
+
+    def assemble(build_pairs, probe_chunk, probe_pairs):
+        if build_is_left:
+            return assemble_join(build, probe_chunk, build_pairs, probe_pairs, key_A, key_B)
+        return assemble_join(probe_chunk, build, probe_pairs, build_pairs, key_A, key_B)
+
+    keys_checked = False
+    for chunk in iter_table_chunks(probe_source, chunk_rows):
+        chunk = chunk.reset_index(drop=True)
+        if not keys_checked:
+            # Checked once, against the first chunk with key values: read_csv types each chunk on its own,
+            # so a blank stretch of a text key arrives as float64 and only says nothing about the column
+            left_chunk, right_chunk = (build, chunk) if build_is_left else (chunk, build)
+            _check_key_columns(left_chunk, right_chunk, key_A, key_B)
+            keys_checked = all(chunk[key].notna().any() for key in probe_key)
+        probe_pairs, build_pairs = probe_hash_table(hash_table, key_values(chunk, probe_key))
+        build_matched[build_pairs] = True
+        if keep_probe:
+            unmatched = np.flatnonzero(np.bincount(probe_pairs, minlength=len(chunk)) == 0)
+            probe_pairs = np.concatenate([probe_pairs, unmatched])
+            build_pairs = np.concatenate([build_pairs, np.full(len(unmatched), -1)])
+            order = np.argsort(probe_pairs, kind="stable")
+            probe_pairs, build_pairs = probe_pairs[order], build_pairs[order]
+        yield assemble(build_pairs, chunk, probe_pairs)
+
+    # Build rows that no chunk matched are only known once the whole file has streamed past
+    if keep_build:
+        unmatched = np.flatnonzero(~build_matched)
+        yield assemble(unmatched, probe_columns, np.full(len(unmatched), -1))
+
+def stream_semi_join(source_A, source_B, join_type, key_A, key_B, chunk_rows=STREAM_CHUNK_ROWS):
+    """Streaming LEFT SEMI/ANTI join over two files. Only B's distinct keys are held in memory (B is read
+    key columns only), and A is read chunk by chunk. Rows come out in file order."""
+    distinct, found = [], {}
+    for chunk in iter_table_chunks(source_B, chunk_rows, columns=key_B):
+        distinct.append(key_values(chunk, key_B).drop_duplicates())
+        _note_key_values(found, chunk, key_B)
+    right_keys = pd.concat(distinct, ignore_index=True).drop_duplicates() if distinct else pd.Series([], dtype="float64")
+    sample_B = _key_sample(found, key_B)
+    keys_checked = False
+    for chunk in iter_table_chunks(source_A, chunk_rows):
+        if not keys_checked:
+            _check_key_columns(chunk, sample_B, key_A, key_B)
+            keys_checked = all(chunk[key].notna().any() for key in key_A)
+        yield assemble_semi_join(chunk, key_membership(key_values(chunk, key_A), right_keys), join_type == "LEFT ANTI")
+
+# =======================
+# RESULT CACHE
+# =======================
+JOIN_CACHE_SIZE = 16  # Finished joins kept across reruns; each holds its result frame
+
+def table_fingerprint(table):
+    """Stable hash of a table's columns, dtypes and values, used to key cached joins."""
+    digest = hashlib.sha1(repr((list(table.columns), [str(dtype) for dtype in table.dtypes])).encode())
+    digest.update(pd.util.hash_pandas_object(table, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+def source_fingerprint(source):
+    """Files are keyed by identity and version rather than content, so they are never read just to hash them."""
+    if hasattr(source, "file_id"):
+        return f"upload:{source.file_id}"
+    stat = os.stat(source)
+    return f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def make_join_view(result, counts):
+    """Everything the page shows for one join: result rows and Venn counts (left only, both, right only)."""
+    return {"result": result, "counts": counts}
+
+def compute_join_view(join_type, key_A, key_B, engine):
+    """Runs the join on the in-memory tables and counts the Venn regions from key statistics."""
+    return make_join_view(do_join(join_type, key_A, key_B, engine), venn_counts(join_type, *join_keys(A, B, key_A, key_B)))
+
+def result_page(result, page_number, page_size):
+    """Slices one page of result rows on the server, so only that page is styled and sent."""
+    start = (page_number - 1) * page_size
+    return result.iloc[start:start + page_size]
+
+def style_result_page(page):
+    """Colours one page of the join result."""
+    # 1. Apply the style (which needs the '_merge' column).
+    styled = page.style.apply(highlight_rows, axis=None)
+    # 2. THEN, hide the '_merge' column from the final display.
+    return styled.hide(subset=['_merge'], axis=1)
+
+class JoinCache:
+    """Bounded LRU of join views keyed by (table fingerprints, join type, key columns, engine).
+
+    Entries are shared across reruns and sessions, so callers must not modify them.
+    """
+
+    def __init__(self, max_entries=JOIN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        entry = self.get(key)
+        if entry is None:
+            entry = compute()
+            self.put(key, entry)
+        return entry
+
+
+@st.cache_resource
+def get_join_cache():
+    # Shared across reruns and sessions so switching join types reuses earlier joins
+    return JoinCache()
+
+# =======================
+# SQLITE BACKEND
+# =======================
+SQLITE_PATH = os.path.join(tempfile.gettempdir(), "join_visualizer.sqlite")  # On disk, so tables can exceed RAM
+SQLITE_MAX_TABLES = 4  # Loaded tables kept in the database; the least recently used beyond this are dropped
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def sqlite_connect():
+    conn = sqlite3.connect(SQLITE_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS table_usage (name TEXT PRIMARY KEY, last_used REAL)")
+    return conn
+
+def _touch_table(conn, name):
+    conn.execute("INSERT OR REPLACE INTO table_usage (name, last_used) VALUES (?, ?)", (name, time.time()))
+    conn.commit()
+
+def sqlite_evict(conn, keep, max_tables=SQLITE_MAX_TABLES):
+    """Drops the least recently used loaded tables beyond `max_tables`, never `keep`.
+
+    Tables loaded before usage was recorded count as the oldest. Dropped pages are reused by later
+    loads, so the file stops growing once it has held `max_tables` tables.
+    """
+    stale = conn.execute(
+        "SELECT m.name FROM sqlite_master m LEFT JOIN table_usage u ON u.name = m.name\n"
+        "WHERE m.type = 'table' AND m.name GLOB 't_*' AND m.name NOT GLOB '*_loading_*' AND m.name != ?\n"
+        "ORDER BY COALESCE(u.last_used, 0) DESC LIMIT -1 OFFSET ?", (keep, max_tables - 1)).fetchall()
+    for name, in stale:
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute("DELETE FROM table_usage WHERE name = ?", (name,))
+            conn.commit()
+        except sqlite3.OperationalError:
+            # Another session is still reading it; a later load drops it
+            conn.rollback()
+
+def sqlite_table(conn, fingerprint, load_chunks):
+    """Name of the SQLite table holding a table's rows, loading it chunk by chunk the first time.
+
+    Tables are named after the data's fingerprint, so reruns and sessions share them. Each load
+    evicts the least recently used tables beyond SQLITE_MAX_TABLES.
+    """
+    name = f"t_{hashlib.sha1(fingerprint.encode()).hexdigest()[:16]}"
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone():
+        _touch_table(conn, name)
+        return name
+    staging = f"{name}_loading_{os.getpid()}_{threading.get_ident()}"
+    try:
+        for chunk in load_chunks():
+            chunk.to_sql(staging, conn, if_exists="append", index=False)
+    except BaseException:
+        # A failed read, or a rerun stopping the script mid-load, leaves no half-loaded table behind
+        conn.rollback()
+        conn.execute(f"DROP TABLE IF EXISTS {staging}")
+        conn.commit()
+        raise
+    try:
+        conn.execute(f"ALTER TABLE {staging} RENAME TO {name}")
+    except sqlite3.OperationalError:
+        # Another session finished loading the same data first
+        conn.execute(f"DROP TABLE {staging}")
+    conn.commit()
+    _touch_table(conn, name)
+    sqlite_evict(conn, name)
+    return name
+
+def sqlite_index(conn, table, columns):
+    """Indexes the join key columns so the join can look up matches instead of scanning."""
+    if not columns:
+        return
+    index = f"i_{table}_{hashlib.sha1(','.join(map(str, columns)).encode()).hexdigest()[:8]}"
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({', '.join(map(_quote, columns))})")
+    conn.commit()
+
+def join_output_columns(columns_A, columns_B, key_A, key_B, how="inner"):
+    """(side, source column, output name) for each column of a join result, named as pandas merge names them.
+    SEMI/ANTI joins keep A's columns only."""
+    if how in SEMI_JOINS:
+        return [("a", column, column) for column in columns_A]
+    shared_keys = {column_A for column_A, column_B in zip(key_A, key_B) if column_A == column_B}
+    overlap = (set(columns_A) & set(columns_B)) - shared_keys
+    output = [("key" if column in shared_keys else "a", column, f"{column}_x" if column in overlap else column)
+              for column in columns_A]
+    output += [("b", column, f"{column}_y" if column in overlap else column)
+               for column in columns_B if column not in shared_keys]
+    return output
+
+def sqlite_join_sql(table_A, table_B, columns_A, columns_B, join_type, key_A, key_B):
+    """SQL equivalent of do_join: the same output columns (with _x/_y suffixes and the `_merge`
+    indicator), the same row order, and NaN keys matching each other through `IS`.
+
+    RIGHT and OUTER joins are written with LEFT JOIN only, so older SQLite versions run them too.
+    SEMI/ANTI joins are (NOT) EXISTS lookups through B's key index, and a CROSS JOIN joins ON 1.
+    """
+    how = join_type.lower()
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    select = []
+    for side, column, alias in join_output_columns(columns_A, columns_B, key_A, key_B, how):
+        if side == "key":
+            select.append(f"COALESCE(a.{_quote(column)}, b.{_quote(column)}) AS {_quote(alias)}")
+        else:
+            select.append(f"{side}.{_quote(column)} AS {_quote(alias)}")
+    on = " AND ".join(f"a.{_quote(column_A)} IS b.{_quote(column_B)}" for column_A, column_B in zip(key_A, key_B)) or "1"
+
+    if how in SEMI_JOINS:
+        merge, negate = ("left_only", "NOT ") if how == "left anti" else ("both", "")
+        columns = ",\n       ".join(select + [f"'{merge}' AS _merge", "a.rowid AS _row_a"])
+        return f"SELECT {columns}\nFROM {table_A} a\nWHERE {negate}EXISTS (SELECT 1 FROM {table_B} b WHERE {on})", "_row_a"
+
+    select += ["CASE WHEN a.rowid IS NULL THEN 'right_only' WHEN b.rowid IS NULL THEN 'left_only' ELSE 'both' END AS _merge",
+               "a.rowid AS _row_a", "b.rowid AS _row_b"]
+    select += [f"COALESCE(a.{_quote(column_A)}, b.{_quote(column_B)}) AS _sort_key_{i}"
+               for i, (column_A, column_B) in enumerate(zip(key_A, key_B))]
+    columns = ",\n       ".join(select)
+
+    if how in ("inner", "cross"):
+        sql, order = f"SELECT {columns}\nFROM {table_A} a JOIN {table_B} b ON {on}", "_row_a, _row_b"
+    elif how == "left":
+        sql, order = f"SELECT {columns}\nFROM {table_A} a LEFT JOIN {table_B} b ON {on}", "_row_a, _row_b"
+    elif how == "right":
+        sql, order = f"SELECT {columns}\nFROM {table_B} b LEFT JOIN {table_A} a ON {on}", "_row_b, _row_a"
+    else:
+        sql = (f"SELECT {columns}\nFROM {table_A} a LEFT JOIN {table_B} b ON {on}\nUNION ALL\n"
+               f"SELECT {columns}\nFROM {table_B} b LEFT JOIN {table_A} a ON {on}\nWHERE a.rowid IS NULL")
+        # Outer joins come out sorted by key, as in pandas
+        order = ", ".join(f"_sort_key_{i} IS NULL, _sort_key_{i}" for i in range(len(key_A))) + ", _row_a IS NULL, _row_a, _row_b"
+    return sql, order
+
+def _sqlite_result(frame, dtypes):
+    """Drops the helper columns and restores the dtypes pandas merge would give: the source
+    dtype, except that integer columns become float once a missing value appears."""
+    frame = frame.drop(columns=[column for column in frame.columns if column.startswith(("_row_", "_sort_key_"))])
+    for column, dtype in dtypes.items():
+        if frame[column].isna().any() and (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)):
+            dtype = "float64"
+        frame[column] = frame[column].astype(dtype)
+    frame["_merge"] = pd.Categorical(frame["_merge"], categories=MERGE_CATEGORIES)
+    return frame
+
+class SqliteJoin:
+    """A join between two tables stored in SQLite, with indexes on both key columns.
+
+    `sample_A` and `sample_B` are frames (or previews) of the tables, used for column names and dtypes.
+    """
+
+    def __init__(self, conn, table_A, table_B, join_type, key_A, key_B, sample_A, sample_B):
+        self.conn = conn
+        key_A, key_B = join_key_names(join_type, key_A, key_B)
+        for table, keys in ((table_A, key_A), (table_B, key_B)):
+            sqlite_index(conn, table, keys)
+        self.sql, self.order = sqlite_join_sql(table_A, table_B, list(sample_A.columns), list(sample_B.columns), join_type, key_A, key_B)
+        self.dtypes = {}
+        for side, column, alias in join_output_columns(list(sample_A.columns), list(sample_B.columns), key_A, key_B, join_type.lower()):
+            source = sample_B if side == "b" else sample_A
+            if side != "key" or sample_A[column].dtype == sample_B[column].dtype:
+                self.dtypes[alias] = source[column].dtype
+
+    def rows(self, limit=None, offset=0):
+        """Result rows in do_join order; `limit` and `offset` page through them inside SQLite."""
+        query = f"SELECT * FROM ({self.sql})\nORDER BY {self.order}" + ("\nLIMIT ? OFFSET ?" if limit is not None else "")
+        params = (limit, offset) if limit is not None else ()
+        return _sqlite_result(pd.read_sql_query(query, self.conn, params=params), self.dtypes)
+
+    def venn_counts(self):
+        """Rows per Venn region (left only, both, right only), counted inside SQLite."""
+        counts = dict(self.conn.execute(f"SELECT _merge, COUNT(*) FROM ({self.sql}) GROUP BY _merge").fetchall())
+        return counts.get("left_only", 0), counts.get("both", 0), counts.get("right_only", 0)
+
+    def query_plan(self):
+        """EXPLAIN QUERY PLAN output, indented as a tree."""
+        depth, lines = {0: -1}, []
+        for node, parent, _, detail in self.conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM ({self.sql})\nORDER BY {self.order}"):
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node] + detail)
+        return "\n".join(lines)
+
+def sqlite_join(left, right, join_type, key_A, key_B):
+    """Join engine that runs the join inside SQLite."""
+    _check_key_columns(left, right, *join_key_names(join_type, key_A, key_B))
+    with closing(sqlite_connect()) as conn:
+        table_A = sqlite_table(conn, table_fingerprint(left), lambda: [left])
+        table_B = sqlite_table(conn, table_fingerprint(right), lambda: [right])
+        return SqliteJoin(conn, table_A, table_B, join_type, key_A, key_B, left, right).rows()
+
+def benchmark_sqlite(left, right, join_type, key_A, key_B):
+    """Times each SQLite step against the in-memory engines on the same tables.
+
+    Loading is skipped when the tables are already in the database, which shows as near-zero load time.
+    """
+    records = []
+    def timed(step, run):
+        start = time.perf_counter()
+        value = run()
+        records.append({"Step": step, "Seconds": round(time.perf_counter() - start, 4)})
+        return value
+
+    with closing(sqlite_connect()) as conn:
+        table_A = timed("SQLite: load Table A", lambda: sqlite_table(conn, table_fingerprint(left), lambda: [left]))
+        table_B = timed("SQLite: load Table B", lambda: sqlite_table(conn, table_fingerprint(right), lambda: [right]))
+        join = timed("SQLite: index keys", lambda: SqliteJoin(conn, table_A, table_B, join_type, key_A, key_B, left, right))
+        timed("SQLite: count result rows", join.venn_counts)
+        timed("SQLite: join and fetch rows", join.rows)
+    for name in ("pandas merge", "Hash join"):
+        timed(f"In memory: {name}", lambda: JOIN_ENGINES[name](left, right, join_type, key_A, key_B))
+    return pd.DataFrame(records)
+
+def sqlite_join_for_page(conn, join_type, key_A, key_B, fingerprint_A, fingerprint_B, source_A=None, source_B=None):
+    """SqliteJoin over the page's tables: the in-memory A and B, or the chosen files loaded chunk by chunk.
+    The fingerprints are the ones already in the page's `table_keys`, so the tables are not hashed on every rerun."""
+    if source_A is None:
+        table_A = sqlite_table(conn, fingerprint_A, lambda: [A])
+        table_B = sqlite_table(conn, fingerprint_B, lambda: [B])
+    else:
+        table_A = sqlite_table(conn, fingerprint_A, lambda: iter_table_chunks(source_A))
+        table_B = sqlite_table(conn, fingerprint_B, lambda: iter_table_chunks(source_B))
+    return SqliteJoin(conn, table_A, table_B, join_type, key_A, key_B, A, B)
+
+SQLITE_ENGINE = "SQLite (on disk)"
+JOIN_ENGINES[SQLITE_ENGINE] = sqlite_join
+
+# =======================
+# PARALLEL HASH JOIN
+# =======================
+PARALLEL_PARTITIONS = 8      # Default partitions; more partitions than workers evens out uneven ones
+PARALLEL_MIN_ROWS = 100_000  # Smaller joins run their partitions in-process; handing them to workers costs more
+
+@st.cache_resource
+def get_join_pool(workers):
+    # Kept across reruns, since every spawned worker starts a fresh interpreter and imports pandas
+    return start_pool(workers)
+
+def _integer_keys(keys):
+    return isinstance(keys.dtype, np.dtype) and (keys.dtype.kind in "bi" or keys.dtype.kind == "u" and keys.dtype.itemsize < 8)
+
+def partition_keys(left_keys, right_keys):
+    """Both sides' keys as NumPy numbers, equal exactly when the keys are, for the workers' shared memory.
+
+    Integer keys, including the codes of composite and dictionary-encoded keys, are used as int64 and
+    float keys as float64, so neither is hashed or numbered again. Anything else (text, dates) is
+    numbered once over both sides.
+    """
+    if _integer_keys(left_keys) and _integer_keys(right_keys):
+        return left_keys.to_numpy(dtype=np.int64), right_keys.to_numpy(dtype=np.int64)
+    if all(_integer_keys(keys) or isinstance(keys.dtype, np.dtype) and keys.dtype.kind == "f" for keys in (left_keys, right_keys)):
+        return left_keys.to_numpy(dtype=np.float64), right_keys.to_numpy(dtype=np.float64)
+    codes, _ = pd.factorize(pd.concat([left_keys, right_keys], ignore_index=True), use_na_sentinel=False)
+    return codes[:len(left_keys)], codes[len(left_keys):]
+
+def hash_partitions(keys, partitions):
+    """Partitions rows on their numeric key (see `partition_keys`), so equal keys always share a partition.
+    Floats go by their floor, with NaN, infinities and floats beyond int64 in partition 0.
+
+    Returns the row numbers grouped by partition and each partition's [begin, end) range in that order.
+    """
+    if keys.dtype.kind == "f":
+        keys = np.where(np.isfinite(keys) & (np.abs(keys) < 2.0 ** 63), np.floor(keys), 0).astype(np.int64)
+    # One multiply (Fibonacci hashing) spreads regular keys such as 10, 20, 30... over every partition,
+    # and a second maps the top 32 bits onto 0..partitions-1 without a division
+    mixed = keys.astype(np.int64, copy=False).view(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    mixed >>= np.uint64(32)
+    mixed *= np.uint64(partitions)
+    mixed >>= np.uint64(32)
+    # Partition numbers this small are grouped by NumPy's radix sort, in linear time
+    partition = mixed.astype(np.min_scalar_type(partitions - 1))
+    order = np.argsort(partition, kind="stable")
+    bounds = np.searchsorted(partition, np.arange(partitions + 1), sorter=order)
+    return order, list(zip(bounds[:-1], bounds[1:]))
+
+def parallel_hash_join(left, right, join_type, key_A, key_B, partitions=PARALLEL_PARTITIONS, workers=None):
+    """Partitioned parallel hash join: both tables are partitioned on the join key and a pool of spawned
+    worker processes (see join_workers.py) hash-joins each pair of partitions. Equal keys share a
+    partition, so no match crosses one.
+
+    Keys and row numbers reach the workers through shared memory. Workers return matches as row numbers,
+    which are concatenated and assembled once, in the hash join's row order. Joins under
+    PARALLEL_MIN_ROWS rows, or with a single worker, run the partitions in-process.
+    Returns the result and one row of statistics per partition.
+    """
+    how = join_type.lower()
+    key_A, key_B = join_key_names(join_type, key_A, key_B)
+    left_keys, right_keys = join_keys(left, right, key_A, key_B)
+    start = time.perf_counter()
+    left_numbers, right_numbers = partition_keys(left_keys, right_keys)
+    if how == "cross":
+        # Every row has the same key: A is cut into even slices and every partition gets all of B
+        left_order, right_order = np.arange(len(left)), np.arange(len(right))
+        cuts = np.linspace(0, len(left), partitions + 1).astype(np.intp)
+        left_ranges, right_ranges = list(zip(cuts[:-1], cuts[1:])), [(0, len(right))] * partitions
+    else:
+        left_order, left_ranges = hash_partitions(left_numbers, partitions)
+        right_order, right_ranges = hash_partitions(right_numbers, partitions)
+    workers = min(partitions, workers or os.cpu_count() or 1) if len(left) + len(right) >= PARALLEL_MIN_ROWS else 1
+
+    blocks = []
+    try:
+        tasks = [{"semi": how in SEMI_JOINS} for _ in range(partitions)]
+        for side, numbers, order, ranges in (("left", left_numbers, left_order, left_ranges), ("right", right_numbers, right_order, right_ranges)):
+            # Each worker gathers its own partition's keys, so that copy is spread over the workers too
+            rows = share_array(order, blocks) if workers > 1 else order
+            numbers = share_array(numbers, blocks) if workers > 1 else numbers
+            for task, (begin, end) in zip(tasks, ranges):
+                task[side] = (rows, numbers, begin, end)
+        setup_seconds = time.perf_counter() - start
+        results = list(get_join_pool(workers).map(join_partition, tasks) if workers > 1 else map(join_partition, tasks))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    stats = pd.DataFrame({
+        "Partition": range(partitions),
+        "A rows": [end - begin for begin, end in left_ranges],
+        "B rows": [end - begin for begin, end in right_ranges],
+        "Output rows": [len(left_pairs) for left_pairs, _, _ in results],
+        "Seconds": [round(seconds, 4) for _, _, seconds in results],
+    })
+    stats.attrs["workers"] = workers
+    stats.attrs["setup_seconds"] = setup_seconds
+    left_pairs = np.concatenate([left_pairs for left_pairs, _, _ in results])
+    right_pairs = np.concatenate([right_pairs for _, right_pairs, _ in results])
+    stats.attrs["match_seconds"] = time.perf_counter() - start
+    if how in SEMI_JOINS:
+        matched = np.zeros(len(left), dtype=bool)
+        matched[left_pairs] = True
+        return assemble_semi_join(left, matched, how == "left anti"), stats
+    left_pairs, right_pairs = _pairs_for_join(left_pairs, right_pairs, left_keys, right_keys, "inner" if how == "cross" else how)
+    return assemble_join(left, right, left_pairs, right_pairs, key_A, key_B), stats
+
+def partition_skew(stats):
+    """Largest partition's input rows over the mean: 1.0 is perfectly even, P means one partition holds everything."""
+    sizes = stats["A rows"] + stats["B rows"]
+    return float(sizes.max() / sizes.mean()) if sizes.sum() else 1.0
+
+def benchmark_parallel_join(join_type, key_A, key_B, partitions, rows=BENCHMARK_ROWS):
+    """Runs the parallel hash join and the single-process hash join on Table A tiled to `rows` rows.
+
+    Returns the partition statistics and, for both joins, the seconds spent finding matching rows
+    and in all. The parallel join runs once untimed first, so starting the workers is not counted.
+    """
+    left = benchmark_table(join_type, rows)
+    parallel_hash_join(left, B, join_type, key_A, key_B, partitions)
+    start = time.perf_counter()
+    _, stats = parallel_hash_join(left, B, join_type, key_A, key_B, partitions)
+    parallel_seconds = time.perf_counter() - start
+    left_keys, right_keys = join_keys(left, B, *join_key_names(join_type, key_A, key_B))
+    start = time.perf_counter()
+    key_membership(left_keys, right_keys) if join_type.lower() in SEMI_JOINS else hash_join_pairs(left_keys, right_keys)
+    serial_match_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    JOIN_ENGINES["Hash join"](left, B, join_type, key_A, key_B)
+    serial_seconds = time.perf_counter() - start
+    return stats, (stats.attrs["match_seconds"], parallel_seconds), (serial_match_seconds, serial_seconds)
+
+PARALLEL_ENGINE = "Parallel hash join"
+JOIN_ENGINES[PARALLEL_ENGINE] = lambda left, right, join_type, key_A, key_B: parallel_hash_join(left, right, join_type, key_A, key_B)[0]
+
+# =======================
+# SYNTHETIC DATA & BENCHMARK SUITE
+# =======================
+SYNTHETIC_MAX_ROWS = 10_000_000
+SYNTHETIC_NAMES = ['Jawaad', 'Sarah', 'Thabo', 'Lerato', 'Imran', 'Alice', 'Ben', 'Cheryl', 'Daniel', 'Naledi', 'Pieter', 'Ayesha']
+SYNTHETIC_CITIES = ['JHB', 'CPT', 'DBN', 'PTA', 'PLZ', 'BFN']
+SYNTHETIC_DEPARTMENTS = ['Finance', 'IT', 'Logistics', 'Marketing', 'HR', 'Legal', 'Sales', 'Research']
+SYNTHETIC_HIRE_DATES = np.datetime_as_string(np.datetime64('2015-01-01') + np.arange(10 * 365))
+# Generated tables get the built-in tables' dtypes
+SCHEMA_A, SCHEMA_B = A.dtypes.to_dict(), B.dtypes.to_dict()
+
+def _pick(rng, pool, rows):
+    return np.asarray(pool, dtype=object)[rng.integers(0, len(pool), rows)]
+
+@st.cache_resource(max_entries=2)
+def generate_tables(rows_A, rows_B, seed=0, skew=0.0, match_rate=0.8, duplicate_rate=0.0):
+    """Seeded synthetic Employees (A) and Departments (B) with the columns and dtypes of the built-in tables.
+
+    - duplicate_rate: share of B rows that repeat an earlier DepartmentID, making the join many-to-many
+    - match_rate: share of A rows whose DepartmentID exists in B; the rest point at IDs that B lacks
+    - skew: Zipf exponent for how A's matching rows spread over departments (0 = evenly, 1 and up = a few dominate)
+
+    Shared across reruns and sessions, so callers must not modify the tables.
+    """
+    rng = np.random.default_rng(seed)
+    distinct = max(1, min(rows_B, round(rows_B * (1 - duplicate_rate))))
+    department_ids = 10 * np.arange(1, distinct + 1)
+    b_ids = np.concatenate([department_ids, department_ids[rng.integers(0, distinct, rows_B - distinct)]])
+    rng.shuffle(b_ids)
+
+    # Unmatched rows get IDs beyond B's, then matched rows are drawn from B's IDs
+    a_ids = 10 * (distinct + 1 + rng.integers(0, distinct, rows_A))
+    matched = rng.random(rows_A) < match_rate
+    if skew > 0:
+        weights = 1.0 / np.arange(1, distinct + 1) ** skew
+        a_ids[matched] = department_ids[rng.choice(distinct, int(matched.sum()), p=weights / weights.sum())]
+    else:
+        a_ids[matched] = department_ids[rng.integers(0, distinct, int(matched.sum()))]
+
+    employees = pd.DataFrame({
+        'EmployeeID': np.arange(101, 101 + rows_A),
+        'Employee': _pick(rng, SYNTHETIC_NAMES, rows_A),
+        'DepartmentID': a_ids,
+        'City': _pick(rng, SYNTHETIC_CITIES, rows_A),
+        'HireDate': _pick(rng, SYNTHETIC_HIRE_DATES, rows_A),
+        'Salary': 40000 + 500 * rng.integers(0, 101, rows_A),
+        'ManagerID': 900 + rng.integers(0, max(1, rows_A // 50), rows_A),
+    }).astype(SCHEMA_A)
+    departments = pd.DataFrame({
+        'DepartmentID': b_ids,
+        'Department': _pick(rng, SYNTHETIC_DEPARTMENTS, rows_B),
+        'Location': _pick(rng, SYNTHETIC_CITIES, rows_B),
+        'Budget': 100000 + 50000 * rng.integers(0, 20, rows_B),
+        'HeadOfDepartment': _pick(rng, SYNTHETIC_NAMES, rows_B),
+    }).astype(SCHEMA_B)
+    return employees, departments
+
+def iter_join_benchmark(left, right, key_A, key_B, join_types, engines, max_rows=DEFAULT_ROW_BUDGET):
+    """Times each join type on each engine, yielding one record per run.
+
+    Peak memory is traced with tracemalloc, which sees Python objects and NumPy buffers but not
+    pyarrow string buffers or SQLite's own memory. Joins whose exact result size
+    is over `max_rows` are skipped rather than run.
+    """
+    for join_type in join_types:
+        try:
+            result_rows = sum(venn_counts(join_type, *join_keys(left, right, *join_key_names(join_type, key_A, key_B))))
+            note = f"Skipped: {result_rows:,} rows is over the {max_rows:,}-row budget" if result_rows > max_rows else ""
+        except ValueError as error:
+            note = f"Skipped: {error}"
+        for engine in engines:
+            record = {"Join type": join_type, "Engine": engine, "Output rows": None, "Seconds": None,
+                      "Rows/sec": None, "Peak MB": None, "Note": note}
+            if not note:
+                tracemalloc.start()
+                start = time.perf_counter()
+                output = JOIN_ENGINES[engine](left, right, join_type, key_A, key_B)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                record.update({"Output rows": len(output), "Seconds": round(elapsed, 4),
+                               "Rows/sec": int((len(left) + len(right)) / elapsed), "Peak MB": round(peak / 2 ** 20, 1)})
+                del output
+            yield record
+
+def draw_benchmark(suite):
+    """Grouped bars of seconds per join type, one colour per engine."""
+    fig = go.Figure([go.Bar(name=engine, x=runs["Join type"], y=runs["Seconds"], customdata=runs["Peak MB"],
+                            hovertemplate="%{x}: %{y:.3f} s, peak %{customdata} MB")
+                     for engine, runs in suite.dropna(subset=["Seconds"]).groupby("Engine", sort=False)])
+    fig.update_layout(barmode="group", height=350, template="plotly_white", margin=dict(l=20, r=20, t=40, b=20),
+                      title="Seconds per join", yaxis_title="Seconds")
+    return fig
+
+# =======================
+# DICTIONARY ENCODING
+# =======================
+CATEGORICAL_MAX_SHARE = 0.5  # Text columns are encoded when their distinct values are at most this share of their rows
+
+def shared_dictionary(columns, max_share=CATEGORICAL_MAX_SHARE):
+    """One sorted CategoricalDtype over the values of all `columns`, or None when they are not all text
+    or have too many distinct values for codes to pay off."""
+    if not all(pd.api.types.is_string_dtype(column) for column in columns):
+        return None
+    values = pd.concat(columns, ignore_index=True)
+    categories = pd.Index(values.dropna().unique()).sort_values()
+    if len(categories) > max_share * len(values):
+        return None
+    return pd.CategoricalDtype(categories)
+
+def encode_tables(left, right, key_A, key_B, max_share=CATEGORICAL_MAX_SHARE):
+    """Dictionary-encodes the low-cardinality text columns of both tables.
+
+    Each pair of key columns gets one dictionary shared by A and B, so equal keys get equal integer
+    codes and the engines join on the codes instead of the strings. Columns with the same name in
+    both tables share a dictionary too. Returns the encoded tables and one report row per encoded column.
+    """
+    tables = {"A": left.copy(deep=False), "B": right.copy(deep=False)}
+    pairs = list(zip(key_A, key_B))
+    pairs += [(column, column) for column in left.columns.intersection(right.columns)
+              if column not in key_A and column not in key_B]
+    groups = [[("A", column_A), ("B", column_B)] for column_A, column_B in pairs]
+    groups += [[("A", column)] for column in left.columns if column not in {column_A for column_A, _ in pairs}]
+    groups += [[("B", column)] for column in right.columns if column not in {column_B for _, column_B in pairs}]
+
+    records = []
+    for group in groups:
+        dtype = shared_dictionary([tables[name][column] for name, column in group], max_share)
+        if dtype is None:
+            continue
+        for name, column in group:
+            before = tables[name][column].memory_usage(deep=True, index=False)
+            tables[name][column] = tables[name][column].astype(dtype)
+            records.append({"Table": name, "Column": column, "Dictionary": len(dtype.categories),
+                            "Shared with": " · ".join(f"{other}.{other_column}" for other, other_column in group if other != name) or "—",
+                            "Before MB": round(before / 2 ** 20, 3),
+                            "After MB": round(tables[name][column].memory_usage(deep=True, index=False) / 2 ** 20, 3)})
+    report = pd.DataFrame(records, columns=["Table", "Column", "Dictionary", "Shared with", "Before MB", "After MB"])
+    return tables["A"], tables["B"], report
+
+def benchmark_encoding(raw_left, raw_right, left, right, join_type, key_A, key_B, engine):
+    """Seconds for the same join on the raw tables and on their dictionary-encoded copies."""
+    seconds = []
+    for tables in ((raw_left, raw_right), (left, right)):
+        start = time.perf_counter()
+        JOIN_ENGINES[engine](*tables, join_type, key_A, key_B)
+        seconds.append(time.perf_counter() - start)
+    return tuple(seconds)
+
 # =======================
 # LAYOUT
 # =======================
 st.title("SQL Join Visualizer 💾")
 
 st.markdown("### 1. Select Tables and Join Keys")
+data_source = st.radio("Data Source:", ["Built-in Example", "CSV / Parquet Files", "Synthetic Data"], horizontal=True)
+source_A = source_B = None
+# Generated tables are keyed by their parameters, so millions of rows are not re-hashed on every rerun
+fingerprint_A = fingerprint_B = None
+if data_source == "CSV / Parquet Files":
+    upload_A_col, upload_B_col = st.columns(2)
+    with upload_A_col:
+        source_A = st.file_uploader("Table A file:", type=["csv", "parquet", "pq"]) or st.text_input("...or a path to Table A:").strip()
+    with upload_B_col:
+        source_B = st.file_uploader("Table B file:", type=["csv", "parquet", "pq"]) or st.text_input("...or a path to Table B:").strip()
+    missing = [src for src in (source_A, source_B) if isinstance(src, str) and src and not os.path.exists(src)]
+    if missing:
+        st.error(f"File not found: `{missing[0]}`")
+    if not source_A or not source_B or missing:
+        st.info("Choose a file for both tables to join them. The built-in example is shown until then.")
+        source_A = source_B = None
+    else:
+        # Only the first rows are loaded here; the join itself streams the files
+        A, B = peek_table(source_A), peek_table(source_B)
+elif data_source == "Synthetic Data":
+    rows_A_col, rows_B_col, seed_col = st.columns(3)
+    synthetic_rows_A = rows_A_col.number_input("Employees (Table A rows):", min_value=1, max_value=SYNTHETIC_MAX_ROWS, value=1_000_000, step=100_000)
+    synthetic_rows_B = rows_B_col.number_input("Departments (Table B rows):", min_value=1, max_value=SYNTHETIC_MAX_ROWS, value=1_000, step=100)
+    synthetic_seed = seed_col.number_input("Seed:", min_value=0, value=0)
+    skew_col, match_col, duplicate_col = st.columns(3)
+    synthetic_skew = skew_col.slider("Key skew (Zipf exponent):", 0.0, 2.0, 0.0, 0.1, help="0 spreads employees evenly over departments; 1 and above piles them onto a few.")
+    synthetic_match_rate = match_col.slider("Match rate:", 0.0, 1.0, 0.8, 0.05, help="Share of employees whose DepartmentID exists in Table B.")
+    synthetic_duplicate_rate = duplicate_col.slider("Duplicate rate:", 0.0, 0.95, 0.0, 0.05, help="Share of Table B rows that repeat another row's DepartmentID.")
+    synthetic_params = (synthetic_rows_A, synthetic_rows_B, synthetic_seed, synthetic_skew, synthetic_match_rate, synthetic_duplicate_rate)
+    with st.spinner("Generating tables..."):
+        A, B = generate_tables(*synthetic_params)
+    fingerprint_A, fingerprint_B = f"synthetic:A:{synthetic_params}", f"synthetic:B:{synthetic_params}"
+
 key_col, left_col, right_col = st.columns([1, 2, 2])
 
 with key_col:
     st.markdown("##### Join Key Selection")
-    # User selects the column to join on for each table
-    join_key_A = st.selectbox("Key Column (Table A):", A.columns.tolist(), index=0)
-    join_key_B = st.selectbox("Key Column (Table B):", B.columns.tolist(), index=0)
+    # User selects the column(s) to join on for each table; several columns, in order, make a composite key
+    selected_key_A = st.multiselect("Key Column(s) (Table A):", A.columns.tolist(), default=A.columns[:1].tolist())
+    selected_key_B = st.multiselect("Key Column(s) (Table B):", B.columns.tolist(), default=B.columns[:1].tolist())
 
 with left_col:
-    st.subheader("Table A (Employees)")
-    st.dataframe(A, use_container_width=True)
+    st.subheader(f"Table A (Employees, {len(A):,} rows)" if fingerprint_A else "Table A (Employees)" if source_A is None else f"Table A (first {len(A)} rows)")
+    st.dataframe(A.head(PREVIEW_ROWS), use_container_width=True)
 
 with right_col:
-    st.subheader("Table B (Departments)")
-    st.dataframe(B, use_container_width=True)
+    st.subheader(f"Table B (Departments, {len(B):,} rows)" if fingerprint_B else "Table B (Departments)" if source_B is None else f"Table B (first {len(B)} rows)")
+    st.dataframe(B.head(PREVIEW_ROWS), use_container_width=True)
 
 st.divider()
 
 # --- Join Selection and Execution ---
 st.markdown("### 2. Select Join Type and View Result")
-join_type = st.radio("Choose Join Type", ["INNER", "LEFT", "RIGHT", "OUTER"], horizontal=True)
+type_col, engine_col = st.columns([3, 1])
+with type_col:
+    join_type = st.radio("Choose Join Type", JOIN_TYPES, horizontal=True)
+with engine_col:
+    join_engine = st.selectbox("Join Engine:", list(JOIN_ENGINES), index=0)
+    encode_text = st.checkbox("Dictionary-encode text", disabled=source_A is not None,
+                              help="Stores repetitive text columns as integer codes into a shared dictionary and joins on the codes.")
+
+with st.expander("🛡️ Result Size Budget"):
+    st.write("Before joining, the result size is estimated from the key columns. Joins over budget are refused.")
+    budget_rows_col, budget_memory_col, estimator_col = st.columns(3)
+    with budget_rows_col:
+        row_budget = st.number_input("Maximum result rows:", min_value=1, value=DEFAULT_ROW_BUDGET, step=100_000)
+    with budget_memory_col:
+        memory_budget_mb = st.number_input("Maximum result memory (MB):", min_value=1, value=DEFAULT_MEMORY_BUDGET_MB, step=64)
+    with estimator_col:
+        estimator = st.radio("Estimator:", ESTIMATORS, help="Sketches use a fixed amount of memory however large the tables are.")
 
 # -----------------
 # PROCESSING
 # -----------------
-result = do_join(join_type, join_key_A, join_key_B)
+join_cache = get_join_cache()
+try:
+    join_key_A, join_key_B = join_key_names(join_type, selected_key_A, selected_key_B)
+    raw_A, raw_B, encoding_report = A, B, None
+    if source_A is None and encode_text:
+        fingerprint_A, fingerprint_B = fingerprint_A or table_fingerprint(A), fingerprint_B or table_fingerprint(B)
+        A, B, encoding_report = join_cache.get_or_compute(("encoded", fingerprint_A, fingerprint_B, tuple(join_key_A), tuple(join_key_B)),
+                                                          lambda: encode_tables(A, B, join_key_A, join_key_B))
+        # Encoded results carry categorical columns, so they are cached apart from the raw ones
+        fingerprint_A, fingerprint_B = f"{fingerprint_A}:encoded", f"{fingerprint_B}:encoded"
+    if source_A is None:
+        table_keys = (fingerprint_A or table_fingerprint(A), fingerprint_B or table_fingerprint(B), join_type, tuple(join_key_A), tuple(join_key_B))
+        estimate = join_cache.get_or_compute(("estimate", estimator) + table_keys,
+                                             lambda: estimate_join(join_type, *join_keys(A, B, join_key_A, join_key_B), estimator))
+    else:
+        preview_rows = st.number_input("Result rows to preview:", min_value=10, max_value=10_000, value=PREVIEW_ROWS, step=10)
+        table_keys = (source_fingerprint(source_A), source_fingerprint(source_B), join_type, tuple(join_key_A), tuple(join_key_B))
+        estimate = join_cache.get_or_compute(("estimate", estimator) + table_keys,
+                                             lambda: estimate_file_join(join_type, source_A, source_B, join_key_A, join_key_B, estimator))
+except ValueError as error:
+    st.error(f"Cannot join A.{key_label(selected_key_A)} with B.{key_label(selected_key_B)}: {error}")
+    st.stop()
+
+estimated_rows = sum(estimate["counts"])
+# A result row holds one row of each table, or only A's row for SEMI/ANTI (previews stand in for files)
+estimated_bytes = estimated_rows * (table_row_bytes(A) + (0 if join_type.lower() in SEMI_JOINS else table_row_bytes(B)))
+verdict = budget_verdict(estimated_rows, estimated_bytes, row_budget, memory_budget_mb)
+
+if verdict == "refuse":
+    join_view = None
+    join_counts = estimate["counts"]
+elif source_A is None:
+    # Engines return the same rows but not always in the same order (pandas' INNER order is its own), and the
+    # chosen engine should actually run, so each engine's result is cached apart; the estimate is shared
+    join_view = join_cache.get_or_compute(table_keys + (join_engine,), lambda: compute_join_view(join_type, join_key_A, join_key_B, join_engine))
+    join_counts = join_view["counts"]
+else:
+    # Streamed previews follow file order and SQLite previews follow pandas order, so they are cached apart
+    view_key = table_keys + (preview_rows, join_engine == SQLITE_ENGINE)
+    join_view = join_cache.get(view_key)
+    if join_view is not None:
+        join_counts = join_view["counts"]
+    elif join_engine == SQLITE_ENGINE:
+        with st.spinner("Joining in SQLite (files are loaded into the database the first time)..."):
+            with closing(sqlite_connect()) as conn:
+                page_join = sqlite_join_for_page(conn, join_type, join_key_A, join_key_B, *table_keys[:2], source_A, source_B)
+                join_view = make_join_view(page_join.rows(limit=preview_rows), page_join.venn_counts())
+        join_cache.put(view_key, join_view)
+        join_counts = join_view["counts"]
+    elif estimator == ESTIMATORS[0]:
+        join_counts = estimate["counts"]
+    else:
+        # Only the two key columns are read to count the result before any rows are joined
+        join_counts = venn_counts(join_type, *join_keys(read_key_columns(source_A, join_key_A), read_key_columns(source_B, join_key_B),
+                                                        join_key_A, join_key_B))
+
+left_only, both, right_only = join_counts
+
+st.subheader(f"{join_type} JOIN Result" + (f" (on A.{key_label(join_key_A)} = B.{key_label(join_key_B)})" if join_key_A else ""))
 
-# Count venn sections
-left_only = (result["_merge"] == "left_only").sum()
-right_only = (result["_merge"] == "right_only").sum()
-both = (result["_merge"] == "both").sum()
+estimate_col, actual_col, memory_col = st.columns(3)
+estimate_col.metric("Estimated rows", f"{estimated_rows:,}", help=f"{estimator}: {estimate['distinct'][0]:,} distinct keys in A, {estimate['distinct'][1]:,} in B.")
+actual_col.metric("Actual rows", "Not built" if verdict == "refuse" else f"{sum(join_counts):,}")
+memory_col.metric("Estimated result memory", f"{estimated_bytes / 2 ** 20:,.1f} MB")
 
-st.subheader(f"{join_type} JOIN Result (on A.{join_key_A} = B.{join_key_B})")
+if verdict != "ok":
+    (rows_A, rows_B), (distinct_A, distinct_B) = estimate["rows"], estimate["distinct"]
+    fan_out = (f" Both key columns repeat values (about {rows_A / max(1, distinct_A):,.1f} rows per key in A and "
+               f"{rows_B / max(1, distinct_B):,.1f} in B), so this is a many-to-many join."
+               if join_type in ("INNER", "LEFT", "RIGHT", "OUTER") and rows_A > distinct_A and rows_B > distinct_B else "")
+    budget = f"the budget of {row_budget:,} rows / {memory_budget_mb:,} MB"
+    if verdict == "refuse":
+        st.error(f"Refused: this join would produce about {estimated_rows:,} rows ({estimated_bytes / 2 ** 20:,.0f} MB), over {budget}.{fan_out}")
+    else:
+        st.warning(f"This join will produce about {estimated_rows:,} rows, more than half of {budget}.{fan_out}")
+
+st.caption(f"**{sum(join_counts):,}** result rows{' (estimated)' if verdict == 'refuse' else ''}: "
+           f"{both:,} matched, {left_only:,} only in A, {right_only:,} only in B.")
 
 # Display Educational Notes and Legend
 st.markdown(f"**Explanation:** {get_join_explanation(join_type, join_key_A, join_key_B)}")
@@ -160,14 +1470,158 @@ st.markdown(f"<span style='background-color: {COLOR_RIGHT_ONLY}'>&nbsp;&nbsp;&nb
 # Display Styled DataFrame
 # --- Fix Applied Here ---
 
-# 1. Apply the style (which needs the '_merge' column).
-styled = result.style.apply(highlight_rows, axis=1)
+page_size = st.selectbox("Rows per page:", PAGE_SIZES, index=1)
+
+if join_view is None and verdict != "refuse":
+    # Counts are already known, so the larger file is only streamed until the preview is full
+    stream_status = st.empty()
+    stream_preview = st.empty()
+    preview_parts, shown = [], 0
+    chunks = 0
+    try:
+        for chunk_result in stream_join(source_A, source_B, join_type, join_key_A, join_key_B):
+            chunks += 1
+            preview_parts.append(chunk_result.iloc[:preview_rows - shown])
+            result = pd.concat(preview_parts, ignore_index=True)
+            shown = len(result)
+            stream_preview.dataframe(style_result_page(result_page(result, 1, page_size)), use_container_width=True)
+            stream_status.info(f"Processed {chunks:,} chunks: **{shown:,}** of the first {preview_rows:,} rows found...")
+            if shown >= preview_rows:
+                break
+        stream_status.success(f"**{sum(join_counts):,}** result rows. Showing the first {shown:,}.")
+        if preview_parts:
+            join_view = make_join_view(result, join_counts)
+            join_cache.put(view_key, join_view)
+            stream_preview.empty()
+    except ValueError as error:
+        stream_status.error(f"Could not join these files: {error}")
+elif source_A is not None and join_view is not None:
+    st.success(f"**{sum(join_counts):,}** result rows. Showing the first {len(join_view['result']):,}.")
 
-# 2. THEN, hide the '_merge' column from the final display.
-st.dataframe(styled.hide(subset=['_merge'], axis=1), use_container_width=True)
+if join_view is not None:
+    result = join_view["result"]
+    page_count = max(1, -(-len(result) // page_size))
+    page_number = st.number_input(f"Page (of {page_count:,}):", min_value=1, max_value=page_count, value=1)
+    page = result_page(result, page_number, page_size)
+    first_row = (page_number - 1) * page_size
+    st.caption(f"Rows {first_row + 1:,}–{first_row + len(page):,} of {len(result):,}" if len(result) else "No result rows.")
+    st.dataframe(style_result_page(page), use_container_width=True)
 
 st.divider()
 
 # Display Visual Diagram
 st.markdown("### 3. Venn Diagram Visualization")
-st.plotly_chart(draw_venn(join_type, left_only, both, right_only))
\ No newline at end of file
+if join_engine == SQLITE_ENGINE and verdict != "refuse":
+    venn_col, plan_col = st.columns([3, 2])
+    with venn_col:
+        st.plotly_chart(draw_venn(join_type, left_only, both, right_only))
+    with plan_col:
+        st.markdown("##### SQLite Query Plan")
+        with closing(sqlite_connect()) as conn:
+            st.code(sqlite_join_for_page(conn, join_type, join_key_A, join_key_B, *table_keys[:2], source_A, source_B).query_plan(),
+                    language="text")
+        st.caption("`SEARCH ... USING INDEX` means matches are looked up through the key index instead of scanning the table.")
+else:
+    st.plotly_chart(draw_venn(join_type, left_only, both, right_only))
+
+if verdict != "refuse":
+    with st.expander("⏱️ SQLite vs In-Memory"):
+        st.write("Times loading, indexing and joining in SQLite against the in-memory engines on the current tables.")
+        if source_A is not None:
+            st.caption("Both files are read fully into memory for the in-memory side of the comparison.")
+        if st.button("Compare Backends"):
+            left_table, right_table = (A, B) if source_A is None else (read_table(source_A), read_table(source_B))
+            st.dataframe(benchmark_sqlite(left_table, right_table, join_type, join_key_A, join_key_B), use_container_width=True, hide_index=True)
+
+st.divider()
+
+# --- How the engine runs the join ---
+st.markdown("### 4. Inside the Join Engine")
+st.write("A hash join stores the **smaller** table in buckets keyed by the join value (build), "
+         "then looks up every row of the **larger** table in those buckets (probe).")
+if join_key_A:
+    steps = hash_join_steps(A, B, join_key_A, join_key_B)
+    step_col, chart_col = st.columns([1, 2])
+    with step_col:
+        step = st.slider("Step:", min_value=1, max_value=len(steps), value=1)
+        play = st.button("▶ Play Build & Probe")
+        step_note = st.empty()
+    with chart_col:
+        step_chart = st.empty()
+
+    for current in (range(step, len(steps) + 1) if play else [step]):
+        step_note.info(f"**{steps[current - 1]['phase']}** — {steps[current - 1]['note']}")
+        step_chart.plotly_chart(draw_hash_table(steps[current - 1]), key=f"hash_table_{current}")
+        if play:
+            time.sleep(0.6)
+else:
+    st.info("A CROSS JOIN has no keys to hash: every row of A is paired with every row of B.")
+
+with st.expander("⏱️ Engine Throughput"):
+    st.write(f"Joins Table A repeated to {BENCHMARK_ROWS:,} rows against Table B with every engine.")
+    if st.button("Run Benchmark"):
+        st.dataframe(benchmark_join_engines(join_type, join_key_A, join_key_B), use_container_width=True, hide_index=True)
+
+with st.expander("📊 Benchmark Suite"):
+    st.write(f"Runs each join type on each engine over the current tables ({len(A):,} × {len(B):,} rows), timing every run "
+             "and tracing its peak memory. Choose **Synthetic Data** above for tables of up to "
+             f"{SYNTHETIC_MAX_ROWS:,} rows with controlled skew, match rate and duplicates.")
+    suite_types_col, suite_engines_col = st.columns(2)
+    suite_types = suite_types_col.multiselect("Join types:", JOIN_TYPES, default=JOIN_TYPES)
+    suite_engines = suite_engines_col.multiselect("Engines:", list(JOIN_ENGINES), default=[name for name in JOIN_ENGINES if name != SQLITE_ENGINE])
+    st.caption(f"Joins over the {row_budget:,}-row budget are skipped. Peak memory covers Python objects and NumPy buffers, "
+               "not pyarrow string buffers or SQLite.")
+    if st.button("Run Benchmark Suite"):
+        suite_progress = st.progress(0.0)
+        records = []
+        for record in iter_join_benchmark(A, B, selected_key_A, selected_key_B, suite_types, suite_engines, row_budget):
+            records.append(record)
+            suite_progress.progress(len(records) / (len(suite_types) * len(suite_engines)), text=f"{record['Join type']} · {record['Engine']}")
+        if records:
+            suite = pd.DataFrame(records).astype({"Output rows": "Int64", "Rows/sec": "Int64"})
+            st.plotly_chart(draw_benchmark(suite))
+            st.dataframe(suite, use_container_width=True, hide_index=True)
+            st.download_button("Download Results (CSV)", suite.to_csv(index=False), file_name="join_benchmark.csv", mime="text/csv")
+
+if encoding_report is not None:
+    with st.expander("🗜️ Dictionary Encoding", expanded=True):
+        st.write(f"Text columns with at most {CATEGORICAL_MAX_SHARE:.0%} distinct values are stored as integer codes into a "
+                 "sorted dictionary. Each pair of key columns shares one dictionary, so the engines match codes instead of strings.")
+        raw_bytes = raw_A.memory_usage(deep=True, index=False).sum() + raw_B.memory_usage(deep=True, index=False).sum()
+        encoded_bytes = A.memory_usage(deep=True, index=False).sum() + B.memory_usage(deep=True, index=False).sum()
+        before_col, after_col, saved_col = st.columns(3)
+        before_col.metric("Tables before", f"{raw_bytes / 2 ** 20:,.2f} MB")
+        after_col.metric("Tables after", f"{encoded_bytes / 2 ** 20:,.2f} MB")
+        saved_col.metric("Saved", f"{1 - encoded_bytes / max(1, raw_bytes):.0%}",
+                         help="Small tables can grow: every dictionary has a fixed overhead that only many rows pay back.")
+        if encoding_report.empty:
+            st.info("No text column repeats its values enough to be encoded.")
+        else:
+            st.dataframe(encoding_report, use_container_width=True, hide_index=True)
+        if verdict != "refuse" and st.button("Measure Join Speedup"):
+            raw_seconds, encoded_seconds = benchmark_encoding(raw_A, raw_B, A, B, join_type, join_key_A, join_key_B, join_engine)
+            raw_time_col, encoded_time_col = st.columns(2)
+            raw_time_col.metric(f"{join_engine} on text", f"{raw_seconds:.3f} s")
+            encoded_time_col.metric(f"{join_engine} on codes", f"{encoded_seconds:.3f} s",
+                                    delta=f"{raw_seconds / encoded_seconds:.2f}× speedup", delta_color="off")
+
+with st.expander("🧵 Parallel Hash Join"):
+    st.write(f"Partitions Table A (repeated to {BENCHMARK_ROWS:,} rows) and Table B on the join key, "
+             f"then joins each pair of partitions in a pool of up to {os.cpu_count() or 1} worker processes.")
+    if (os.cpu_count() or 1) == 1:
+        st.caption("This machine has one CPU, so the partitions run one after another and the parallel join cannot beat the single-process one.")
+    partitions = st.slider("Partitions:", min_value=1, max_value=64, value=PARALLEL_PARTITIONS)
+    if st.button("Run Parallel Join"):
+        partition_stats, parallel_seconds, serial_seconds = benchmark_parallel_join(join_type, join_key_A, join_key_B, partitions)
+        workers = partition_stats.attrs["workers"]
+        match_col, join_col, skew_col = st.columns(3)
+        match_col.metric(f"Finding matches ({workers} worker{'s' if workers != 1 else ''})", f"{parallel_seconds[0]:.3f} s",
+                         delta=f"{serial_seconds[0] / parallel_seconds[0]:.2f}× the single-process {serial_seconds[0]:.3f} s", delta_color="off",
+                         help=f"Partitioning ({partition_stats.attrs['setup_seconds']:.3f} s, in this process) plus the workers' hash joins, "
+                              "against the hash join's build and probe.")
+        join_col.metric("Whole join", f"{parallel_seconds[1]:.3f} s",
+                        delta=f"{serial_seconds[1] / parallel_seconds[1]:.2f}× the single-process {serial_seconds[1]:.3f} s", delta_color="off",
+                        help="Adds building the result table from the matches, which runs in this process for both joins.")
+        skew_col.metric("Partition skew", f"{partition_skew(partition_stats):.2f}",
+                        help="Largest partition's input rows over the mean. A few distinct keys, or one very common key, leave partitions empty or overloaded.")
+        st.dataframe(partition_stats, use_container_width=True, hide_index=True)
@@ -0,0 +1,76 @@
+"""Worker side of the partitioned parallel hash join in join_visualizer_3.py.
+
+Kept out of the Streamlit script so that spawned worker processes can import it: importing
+the script itself would run its whole page. Arrays reach the workers through shared memory.
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def share_array(array, blocks):
+    """Copies an array into a new shared memory block and returns the spec workers read it by.
+    The block is appended to `blocks`; the caller closes and unlinks it once the workers are done."""
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    blocks.append(block)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block.name, array.dtype.str, len(array)
+
+
+def read_side(side):
+    """(row numbers, keys) of one side of a task.
+
+    A side is (grouped row numbers, the table's keys, begin, end): the partition's rows are
+    [begin, end) of the row numbers, and their keys are gathered here, in the worker. Either
+    array may be a spec from `share_array`.
+    """
+    rows, keys, begin, end = side
+    blocks = []
+    try:
+        arrays = []
+        for array in (rows, keys):
+            if isinstance(array, tuple):
+                name, dtype, length = array
+                blocks.append(shared_memory.SharedMemory(name=name))
+                array = np.ndarray(length, dtype=dtype, buffer=blocks[-1].buf)
+            arrays.append(array)
+        rows = arrays[0][begin:end].copy()
+        keys = arrays[1][rows]
+        # No view of a block may outlive it
+        del arrays, array
+        return rows, keys
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def join_partition(task):
+    """Hash-joins one partition of A with the same partition of B on their numeric keys.
+
+    Buckets are built on the smaller side and probed with the larger. Matches come back as row
+    numbers of the whole tables, each A row's matches in B's row order; SEMI/ANTI joins return the
+    matched rows of A only. Also returns the seconds spent.
+    """
+    start = time.perf_counter()
+    (left_rows, left_keys), (right_rows, right_keys) = read_side(task["left"]), read_side(task["right"])
+    if task["semi"]:
+        matched = pd.Index(pd.unique(right_keys)).get_indexer(left_keys) >= 0
+        return left_rows[matched], np.empty(0, dtype=np.intp), time.perf_counter() - start
+
+    swap = len(left_keys) < len(right_keys)
+    (build_rows, build_keys), (probe_rows, probe_keys) = ((left_rows, left_keys), (right_rows, right_keys)) if swap else (
+        (right_rows, right_keys), (left_rows, left_keys))
+    build_codes, uniques = pd.factorize(build_keys, use_na_sentinel=False)
+    bucket_rows = np.argsort(build_codes, kind="stable")
+    bucket_sizes = np.bincount(build_codes, minlength=len(uniques))
+    bucket_starts = np.cumsum(bucket_sizes) - bucket_sizes
+    probe_codes = pd.Index(uniques).get_indexer(probe_keys)  # -1 = no bucket
+    hit = np.flatnonzero(probe_codes >= 0)
+    counts = bucket_sizes[probe_codes[hit]]
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    probe_pairs = probe_rows[np.repeat(hit, counts)]
+    build_pairs = build_rows[bucket_rows[np.repeat(bucket_starts[probe_codes[hit]], counts) + offsets]]
+    left_pairs, right_pairs = (build_pairs, probe_pairs) if swap else (probe_pairs, build_pairs)
+    return left_pairs, right_pairs, time.perf_counter() - start
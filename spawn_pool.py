@@ -0,0 +1,28 @@
+"""Process pools for the Streamlit pages' parallel work.
+
+Workers are spawned rather than forked, since forking the threaded Streamlit server is unsafe.
+A spawned process first re-runs the file of the parent's __main__ module, and Streamlit runs a
+page as __main__, so every worker would run the whole page again. Workers are therefore all
+started up front while __main__ is an empty module; the functions they run must live in
+importable modules such as combinations_verifier.py and join_workers.py.
+"""
+import os
+import sys
+import types
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def start_pool(workers):
+    """A spawn-context ProcessPoolExecutor with all `workers` processes already running."""
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    page = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        # Each task submitted while no worker is idle starts a new worker, so this starts them all
+        started = [pool.submit(os.getpid) for _ in range(workers)]
+    finally:
+        sys.modules["__main__"] = page
+    for future in started:
+        future.result()
+    return pool